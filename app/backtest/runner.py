@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import asdict
-from datetime import date
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import repeat
 from statistics import mean
 from collections import Counter
+from contextlib import redirect_stdout
+from typing import Iterator
+
+import numpy as np
 
 from app.engine.recommender import Recommender
 from app.error_messages import friendly_error_message
@@ -12,6 +18,54 @@ from app.models import BacktestRecord
 MODE_ZH = {"normal": "常规", "relaxed": "放宽", "force": "强制"}
 
 
+_WORKER_RECOMMENDER: Recommender | None = None
+
+
+def _init_day_worker(recommender: Recommender) -> None:
+    global _WORKER_RECOMMENDER
+    _WORKER_RECOMMENDER = recommender
+
+
+def _recommend_day(recommender: Recommender, dt: date, count: int | None) -> tuple:
+    try:
+        recs = recommender.recommend_many(dt, count=count)
+    except Exception as exc:
+        return None, None, exc
+    return recs, recommender.get_last_run_meta(), None
+
+
+def _recommend_day_in_worker(dt: date, count: int | None) -> tuple:
+    # Per-symbol progress from several processes would interleave on the shared terminal;
+    # the parent prints each day's summary from the returned meta instead.
+    with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+        return _recommend_day(_WORKER_RECOMMENDER, dt, count)
+
+
+def _nan_to_none(v: float) -> float | None:
+    return None if v != v else v
+
+
+def _column_stats(returns: np.ndarray) -> tuple[list[float], list[float]]:
+    # Per-column (win rate, mean) over the non-NaN entries of an (N, k) return array; 0.0 for an empty column.
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=0)
+    wins = (returns > 0).sum(axis=0)
+    totals = np.where(valid, returns, 0.0).sum(axis=0)
+    safe = np.maximum(counts, 1)
+    win_rates = np.where(counts > 0, wins / safe, 0.0)
+    means = np.where(counts > 0, totals / safe, 0.0)
+    return win_rates.tolist(), means.tolist()
+
+
+def _max_drawdown(net_returns: np.ndarray) -> float:
+    if not net_returns.size:
+        return 0.0
+    # Missing returns count as flat days on the equity curve.
+    equity = np.cumprod(1.0 + np.nan_to_num(net_returns, nan=0.0))
+    peak = np.maximum(np.maximum.accumulate(equity), 1.0)
+    return max(float(((peak - equity) / peak).max()), 0.0)
+
+
 class BacktestRunner:
     def __init__(self, recommender: Recommender):
         self.recommender = recommender
@@ -22,21 +76,33 @@ class BacktestRunner:
         self.slippage_bps = float(cfg.get("slippage_bps", 5.0))
         self.min_commission_per_side = float(cfg.get("min_commission_per_side", 0.0))
         self.enable_cost = bool(cfg.get("enabled", True))
+        slip = self.slippage_bps / 10000.0
+        self._buy_slip_factor = 1.0 + slip
+        self._sell_slip_factor = 1.0 - slip
+        # Approximate min commission with a notional 1.0 base.
+        self._buy_fee = max(self.commission_rate, self.min_commission_per_side)
+        self._sell_fee = max(self.commission_rate + self.stamp_duty_sell_rate, self.min_commission_per_side)
         self.backtest_verbose_errors = bool(recommender.cfg.get("backtest", {}).get("verbose_errors", True))
         self.max_error_examples = int(recommender.cfg.get("backtest", {}).get("max_error_examples", 20))
+        self.parallel_workers = int(recommender.cfg.get("backtest", {}).get("parallel_workers", 1))
+        self.fetch_workers = int(recommender.cfg.get("backtest", {}).get("fetch_workers", 8))
+        self.cache_features = bool(recommender.cfg.get("backtest", {}).get("cache_features", True))
 
     def run(self, start_date: date, end_date: date, count: int | None = None) -> dict:
         trade_dates = self.ds.get_trade_dates(start_date, end_date)
         if len(trade_dates) < 8:
             raise RuntimeError("Not enough trade dates for backtest")
-        records: list[BacktestRecord] = []
+        picks: list[tuple[date, list]] = []
+        pending: list[tuple[date, str, str, str]] = []
+        gross_rows: list[tuple[float | None, float | None, float | None]] = []
         error_counts: Counter[str] = Counter()
         error_examples: list[dict] = []
         mode_counts: Counter[str] = Counter()
-        for dt in trade_dates[:-5]:
-            try:
-                recs = self.recommender.recommend_many(dt, count=count)
-            except Exception as exc:
+        date_index = {d: i for i, d in enumerate(trade_dates)}
+        last_dt = trade_dates[-1]
+        signal_days = trade_dates[:-5]
+        for dt, (recs, run_meta, exc) in zip(signal_days, self._iter_daily_recommendations(signal_days, count)):
+            if exc is not None:
                 key = type(exc).__name__
                 error_counts[key] += 1
                 zh_msg = friendly_error_message(exc)
@@ -45,7 +111,7 @@ class BacktestRunner:
                 if self.backtest_verbose_errors:
                     print(f"[回测][跳过] {dt.isoformat()} {key}: {zh_msg}", flush=True)
                 continue
-            run_meta = self.recommender.get_last_run_meta() or {}
+            run_meta = run_meta or {}
             if self.backtest_verbose_errors:
                 signal_date = run_meta.get("signal_date", "unknown")
                 normal_scored = run_meta.get("normal_scored", "n/a")
@@ -62,77 +128,115 @@ class BacktestRunner:
                     flush=True,
                 )
             mode_counts[recs[0].threshold_mode] += 1
+            picks.append((dt, recs))
+        closes_by_symbol = self._prefetch_forward_closes(picks, last_dt, date_index)
+        for dt, recs in picks:
             symbol_name_pairs = [(r.symbol, r.name) for r in recs]
-            close_maps: dict[str, dict] = {}
-            for symbol, _name in symbol_name_pairs:
-                bars = self.ds.get_daily_bars(symbol, dt, trade_dates[-1])
-                close_maps[symbol] = {b.trade_date: b.close for b in bars}
-            ret_1d_gross = self._calc_basket_forward_return(close_maps, dt, trade_dates, 1)
-            ret_3d_gross = self._calc_basket_forward_return(close_maps, dt, trade_dates, 3)
-            ret_5d_gross = self._calc_basket_forward_return(close_maps, dt, trade_dates, 5)
-            ret_1d_net = self._apply_round_trip_cost(ret_1d_gross)
-            ret_3d_net = self._apply_round_trip_cost(ret_3d_gross)
-            ret_5d_net = self._apply_round_trip_cost(ret_5d_gross)
+            close_arrays = {symbol: closes_by_symbol[symbol] for symbol, _name in symbol_name_pairs}
+            idx = date_index[dt]
+            ret_1d_gross = self._calc_basket_forward_return(close_arrays, idx, 1)
+            ret_3d_gross = self._calc_basket_forward_return(close_arrays, idx, 3)
+            ret_5d_gross = self._calc_basket_forward_return(close_arrays, idx, 5)
             symbols = "+".join(s for s, _ in symbol_name_pairs)
             names = "+".join(n for _, n in symbol_name_pairs)
-            records.append(
-                BacktestRecord(
-                    trade_date=dt,
-                    symbol=symbols,
-                    name=names,
-                    threshold_mode=recs[0].threshold_mode,
-                    ret_1d_gross=ret_1d_gross,
-                    ret_3d_gross=ret_3d_gross,
-                    ret_5d_gross=ret_5d_gross,
-                    ret_1d_net=ret_1d_net,
-                    ret_3d_net=ret_3d_net,
-                    ret_5d_net=ret_5d_net,
-                )
+            pending.append((dt, symbols, names, recs[0].threshold_mode))
+            gross_rows.append((ret_1d_gross, ret_3d_gross, ret_5d_gross))
+        gross = np.array(gross_rows, dtype=np.float64).reshape(len(gross_rows), 3)
+        net = self._apply_round_trip_cost(gross)
+        records = [
+            BacktestRecord(
+                trade_date=dt,
+                symbol=symbols,
+                name=names,
+                threshold_mode=threshold_mode,
+                ret_1d_gross=g[0],
+                ret_3d_gross=g[1],
+                ret_5d_gross=g[2],
+                ret_1d_net=_nan_to_none(n[0]),
+                ret_3d_net=_nan_to_none(n[1]),
+                ret_5d_net=_nan_to_none(n[2]),
             )
-        return self._summary(records, start_date, end_date, len(trade_dates[:-5]), dict(error_counts), error_examples, dict(mode_counts))
+            for (dt, symbols, names, threshold_mode), g, n in zip(pending, gross_rows, net.tolist())
+        ]
+        return self._summary(records, gross, net, start_date, end_date, len(signal_days), dict(error_counts), error_examples, dict(mode_counts))
 
-    def _apply_round_trip_cost(self, gross_ret: float | None) -> float | None:
-        if gross_ret is None:
-            return None
+    def _iter_daily_recommendations(self, days: list[date], count: int | None) -> Iterator[tuple]:
+        if not self.cache_features:
+            yield from self._recommend_days(days, count)
+            return
+        # Signal dates are the trade date before each day, at most 30 days back (resolve_signal_date).
+        self.recommender.set_feature_window((days[0] - timedelta(days=30), days[-1]))
+        try:
+            yield from self._recommend_days(days, count)
+        finally:
+            self.recommender.set_feature_window(None)
+
+    def _recommend_days(self, days: list[date], count: int | None) -> Iterator[tuple]:
+        if self.parallel_workers <= 1:
+            for dt in days:
+                yield _recommend_day(self.recommender, dt, count)
+            return
+        # Days are independent; map() keeps results in submission order so output stays deterministic.
+        with ProcessPoolExecutor(
+            max_workers=self.parallel_workers,
+            initializer=_init_day_worker,
+            initargs=(self.recommender,),
+        ) as executor:
+            yield from executor.map(_recommend_day_in_worker, days, repeat(count), chunksize=4)
+
+    def _prefetch_forward_closes(
+        self, picks: list[tuple[date, list]], last_dt: date, date_index: dict[date, int]
+    ) -> dict[str, np.ndarray]:
+        # A symbol picked on several days is fetched once, from its earliest pick through last_dt.
+        first_dt_by_symbol: dict[str, date] = {}
+        for dt, recs in picks:
+            for r in recs:
+                first_dt_by_symbol.setdefault(r.symbol, dt)
+
+        def fetch(symbol: str, first_dt: date) -> np.ndarray:
+            bars = self.ds.get_daily_bars(symbol, first_dt, last_dt)
+            return self._align_closes(bars, date_index, len(date_index))
+
+        # One task per symbol: fetches overlap across symbols but never race on the same cache file.
+        with ThreadPoolExecutor(max_workers=max(self.fetch_workers, 1)) as executor:
+            futures = {symbol: executor.submit(fetch, symbol, first_dt) for symbol, first_dt in first_dt_by_symbol.items()}
+            return {symbol: future.result() for symbol, future in futures.items()}
+
+    def _apply_round_trip_cost(self, gross_ret: np.ndarray) -> np.ndarray:
+        # Vectorized over all gross returns of a run; NaN marks missing returns and stays NaN.
         if not self.enable_cost:
             return gross_ret
-        slip = self.slippage_bps / 10000.0
-        buy_slip_factor = 1.0 + slip
-        sell_slip_factor = 1.0 - slip
-        buy_fee_rate = self.commission_rate
-        sell_fee_rate = self.commission_rate + self.stamp_duty_sell_rate
-
-        # Approximate min commission with a notional 1.0 base.
-        buy_fee = max(buy_fee_rate, self.min_commission_per_side)
-        sell_fee = max(sell_fee_rate, self.min_commission_per_side)
         gross_factor = 1.0 + gross_ret
-        if gross_factor <= 0:
-            return -1.0
-        net_factor = gross_factor * sell_slip_factor * (1.0 - sell_fee) / (buy_slip_factor * (1.0 + buy_fee))
-        return net_factor - 1.0
+        net_factor = (
+            gross_factor * self._sell_slip_factor * (1.0 - self._sell_fee) / (self._buy_slip_factor * (1.0 + self._buy_fee))
+        )
+        return np.where(gross_factor <= 0, -1.0, net_factor - 1.0)
 
     @staticmethod
-    def _calc_forward_return(close_map: dict, dt: date, trade_dates: list[date], step: int) -> float | None:
-        if dt not in trade_dates:
-            return None
-        idx = trade_dates.index(dt)
-        if idx + step >= len(trade_dates):
+    def _align_closes(bars, date_index: dict[date, int], size: int) -> np.ndarray:
+        # Closes laid out by trade-date position; NaN where the symbol has no bar.
+        closes = np.full(size, np.nan)
+        for b in bars:
+            i = date_index.get(b.trade_date)
+            if i is not None:
+                closes[i] = b.close
+        return closes
+
+    @staticmethod
+    def _calc_forward_return(closes: np.ndarray, idx: int, step: int) -> float | None:
+        if idx + step >= len(closes):
             return None
-        d1 = dt
-        d2 = trade_dates[idx + step]
-        c1 = close_map.get(d1)
-        c2 = close_map.get(d2)
-        if c1 is None or c2 is None or c1 <= 0:
+        c1 = closes[idx]
+        c2 = closes[idx + step]
+        if np.isnan(c1) or np.isnan(c2) or c1 <= 0:
             return None
-        return c2 / c1 - 1.0
+        return float(c2 / c1 - 1.0)
 
     @classmethod
-    def _calc_basket_forward_return(
-        cls, close_maps: dict[str, dict], dt: date, trade_dates: list[date], step: int
-    ) -> float | None:
+    def _calc_basket_forward_return(cls, close_arrays: dict[str, np.ndarray], idx: int, step: int) -> float | None:
         rets = []
-        for close_map in close_maps.values():
-            r = cls._calc_forward_return(close_map, dt, trade_dates, step)
+        for closes in close_arrays.values():
+            r = cls._calc_forward_return(closes, idx, step)
             if r is not None:
                 rets.append(r)
         if not rets:
@@ -142,6 +246,8 @@ class BacktestRunner:
     @staticmethod
     def _summary(
         records: list[BacktestRecord],
+        gross: np.ndarray,
+        net: np.ndarray,
         start_date: date,
         end_date: date,
         attempted_days: int,
@@ -149,46 +255,41 @@ class BacktestRunner:
         error_examples: list[dict],
         mode_counts: dict[str, int],
     ) -> dict:
-        one_gross = [r.ret_1d_gross for r in records if r.ret_1d_gross is not None]
-        three_gross = [r.ret_3d_gross for r in records if r.ret_3d_gross is not None]
-        five_gross = [r.ret_5d_gross for r in records if r.ret_5d_gross is not None]
-        one_net = [r.ret_1d_net for r in records if r.ret_1d_net is not None]
-        three_net = [r.ret_3d_net for r in records if r.ret_3d_net is not None]
-        five_net = [r.ret_5d_net for r in records if r.ret_5d_net is not None]
-        win_rate_gross_1d = sum(1 for x in one_gross if x > 0) / len(one_gross) if one_gross else 0.0
-        win_rate_gross_3d = sum(1 for x in three_gross if x > 0) / len(three_gross) if three_gross else 0.0
-        win_rate_net_1d = sum(1 for x in one_net if x > 0) / len(one_net) if one_net else 0.0
-        win_rate_net_3d = sum(1 for x in three_net if x > 0) / len(three_net) if three_net else 0.0
-        equity = 1.0
-        curve = []
-        for v in one_net:
-            equity *= 1 + v
-            curve.append(equity)
-        peak = 1.0
-        max_dd = 0.0
-        for v in curve:
-            peak = max(peak, v)
-            dd = (peak - v) / peak if peak > 0 else 0.0
-            max_dd = max(max_dd, dd)
-
+        # gross/net are (N, 3) columns of 1d/3d/5d returns aligned with records; NaN marks a missing return.
+        gross_win, gross_mean = _column_stats(gross)
+        net_win, net_mean = _column_stats(net)
         return {
             "period": f"{start_date.isoformat()} -> {end_date.isoformat()}",
             "attempted_days": attempted_days,
             "total_trades": len(records),
             "skipped_days": max(attempted_days - len(records), 0),
-            "win_rate_gross_1d": win_rate_gross_1d,
-            "win_rate_gross_3d": win_rate_gross_3d,
-            "win_rate_net_1d": win_rate_net_1d,
-            "win_rate_net_3d": win_rate_net_3d,
-            "avg_return_1d_gross": mean(one_gross) if one_gross else 0.0,
-            "avg_return_3d_gross": mean(three_gross) if three_gross else 0.0,
-            "avg_return_5d_gross": mean(five_gross) if five_gross else 0.0,
-            "avg_return_1d_net": mean(one_net) if one_net else 0.0,
-            "avg_return_3d_net": mean(three_net) if three_net else 0.0,
-            "avg_return_5d_net": mean(five_net) if five_net else 0.0,
-            "max_drawdown_proxy": max_dd,
+            "win_rate_gross_1d": gross_win[0],
+            "win_rate_gross_3d": gross_win[1],
+            "win_rate_net_1d": net_win[0],
+            "win_rate_net_3d": net_win[1],
+            "avg_return_1d_gross": gross_mean[0],
+            "avg_return_3d_gross": gross_mean[1],
+            "avg_return_5d_gross": gross_mean[2],
+            "avg_return_1d_net": net_mean[0],
+            "avg_return_3d_net": net_mean[1],
+            "avg_return_5d_net": net_mean[2],
+            "max_drawdown_proxy": _max_drawdown(net[:, 0]),
             "threshold_mode_counts": mode_counts,
             "error_counts": error_counts,
             "error_examples": error_examples,
-            "records": [asdict(r) for r in records],
+            "records": [
+                {
+                    "trade_date": r.trade_date.isoformat(),
+                    "symbol": r.symbol,
+                    "name": r.name,
+                    "threshold_mode": r.threshold_mode,
+                    "ret_1d_gross": r.ret_1d_gross,
+                    "ret_3d_gross": r.ret_3d_gross,
+                    "ret_5d_gross": r.ret_5d_gross,
+                    "ret_1d_net": r.ret_1d_net,
+                    "ret_3d_net": r.ret_3d_net,
+                    "ret_5d_net": r.ret_5d_net,
+                }
+                for r in records
+            ],
         }
@@ -1,18 +1,30 @@
 from __future__ import annotations
 
+import copy
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+# Keyed on (resolved path, mtime) so an edited file is re-parsed.
+_CFG_CACHE: dict[tuple[str, float], dict[str, Any]] = {}
+
 
 def load_config(path: str | Path) -> dict[str, Any]:
     cfg_path = Path(path)
     if not cfg_path.exists():
         raise FileNotFoundError(f"Config not found: {cfg_path}")
-    with cfg_path.open("r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
-    if not isinstance(cfg, dict):
-        raise ValueError("Config root must be an object")
-    return cfg
-
+    key = (str(cfg_path.resolve()), cfg_path.stat().st_mtime)
+    cached = _CFG_CACHE.get(key)
+    if cached is None:
+        cfg = yaml.load(cfg_path.read_text(encoding="utf-8"), Loader=_SafeLoader)
+        if not isinstance(cfg, dict):
+            raise ValueError("Config root must be an object")
+        _CFG_CACHE[key] = cached = cfg
+    # Callers get their own copy; the cached dict must stay pristine.
+    return copy.deepcopy(cached)
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import threading
 import time
-from datetime import date, datetime
+from datetime import date
+from operator import attrgetter
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from app.features.indicators import bars_to_df
 from app.models import DailyBar, StockInfo
 
 try:
@@ -18,14 +22,125 @@ else:
     _IMPORT_ERROR = None
 
 
-def _parse_trade_date(v: Any) -> date:
-    if isinstance(v, date):
-        return v
-    if isinstance(v, datetime):
-        return v.date()
-    if isinstance(v, pd.Timestamp):
-        return v.date()
-    return datetime.strptime(str(v)[:10], "%Y-%m-%d").date()
+_BAR_COLUMNS = ["trade_date", "open", "high", "low", "close", "volume", "turnover_rate"]
+_BAR_CSV_DTYPES = {
+    "trade_date": str,
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+    "turnover_rate": "float64",
+}
+
+_BARS_MEM_CACHE_SIZE = 2048
+_MARKET_BY_PREFIX = {
+    **{p: "SH" for p in ("600", "601", "603", "605")},
+    "688": "STAR",
+    **{p: "SZ" for p in ("000", "001", "002", "003", "300")},
+}
+_MARKET_BY_FIRST_CHAR = {"4": "BJ", "8": "BJ"}
+
+
+def _read_bars_csv(path: Path) -> pd.DataFrame:
+    # Explicit dtypes skip per-column type inference; dates are parsed once with a fixed ISO format.
+    df = pd.read_csv(path, dtype=_BAR_CSV_DTYPES, engine="c")
+    if "trade_date" in df.columns:
+        df["trade_date"] = pd.to_datetime(df["trade_date"], format="%Y-%m-%d", errors="coerce")
+    return df
+
+
+def _column_list(df: pd.DataFrame, col: str, default: Any) -> list:
+    if col not in df.columns:
+        return [default] * len(df)
+    return df[col].tolist()
+
+
+def _float_column(df: pd.DataFrame, col: str) -> list[float]:
+    if col not in df.columns:
+        return [float("nan")] * len(df)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64").tolist()
+
+
+def _bars_frame(bars: list[DailyBar]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "trade_date": pd.to_datetime([b.trade_date for b in bars]),
+            "open": [b.open for b in bars],
+            "high": [b.high for b in bars],
+            "low": [b.low for b in bars],
+            "close": [b.close for b in bars],
+            "volume": [b.volume for b in bars],
+            "turnover_rate": [b.turnover_rate for b in bars],
+        }
+    )
+
+
+def _dedup_cached_first(df: pd.DataFrame) -> pd.DataFrame:
+    # Cache merges concat (cached rows, fetched rows): on a repeated trade_date the cached row wins,
+    # so a day already on disk never changes under later runs.
+    return df.drop_duplicates(subset=["trade_date"], keep="first").sort_values("trade_date").reset_index(drop=True)
+
+
+def _code_name_frame(df: pd.DataFrame, code_col: str, name_col: str) -> pd.DataFrame:
+    codes = pd.Series(_column_list(df, code_col, ""), dtype=object).astype(str).str.zfill(6)
+    names = pd.Series(_column_list(df, name_col, ""), dtype=object).fillna("").astype(str)
+    out = pd.DataFrame({"code": codes, "name": names})
+    return out[out["code"] != "000000"]
+
+
+def _union_code_names(names_df: pd.DataFrame, spot_df: pd.DataFrame) -> pd.Series:
+    # Union by code to avoid single-source partial lists; spot names only fill codes missing or unnamed in names_df.
+    names = _code_name_frame(names_df, "code", "name")
+    spot = _code_name_frame(spot_df, "代码", "名称")
+    merged = names.groupby("code", sort=False)["name"].last()
+    spot_codes = pd.Index(spot["code"].unique())
+    merged = merged.reindex(merged.index.append(spot_codes.difference(merged.index, sort=False)))
+    spot_names = spot[spot["name"] != ""].drop_duplicates("code").set_index("code")["name"]
+    missing = (merged.isna() | (merged == "")).to_numpy()
+    merged[missing] = spot_names.reindex(merged.index[missing]).fillna("").to_numpy()
+    return merged
+
+
+def _bars_from_columns(
+    df: pd.DataFrame,
+    date_col: str,
+    open_col: str,
+    high_col: str,
+    low_col: str,
+    close_col: str,
+    volume_col: str,
+    turnover_col: str,
+    volume_default: float | None = None,
+) -> list[DailyBar]:
+    # Column-wise extraction; avoids building a Series per row via iterrows().
+    parsed = pd.to_datetime(df[date_col])
+    dates = parsed.dt.date.tolist()
+    opens = df[open_col].to_numpy(dtype="float64").tolist()
+    highs = df[high_col].to_numpy(dtype="float64").tolist()
+    lows = df[low_col].to_numpy(dtype="float64").tolist()
+    closes = df[close_col].to_numpy(dtype="float64").tolist()
+    if volume_default is None:
+        volumes = df[volume_col].to_numpy(dtype="float64").tolist()
+    else:
+        volumes = [volume_default if v != v else v for v in _float_column(df, volume_col)]
+    turnovers = _float_column(df, turnover_col)
+    bars = [
+        DailyBar(
+            trade_date=d,
+            open=o,
+            high=h,
+            low=lo,
+            close=c,
+            volume=v,
+            turnover_rate=None if t != t else t,
+        )
+        for d, o, h, lo, c, v, t in zip(dates, opens, highs, lows, closes, volumes, turnovers)
+    ]
+    # Feeds and the cache CSV are already chronological; only sort when they are not.
+    if not parsed.is_monotonic_increasing:
+        bars.sort(key=attrgetter("trade_date"))
+    return bars
 
 
 class AkshareDataSource:
@@ -51,6 +166,11 @@ class AkshareDataSource:
         self.bars_cache_dir = self.cache_dir / "bars"
         self.meta_cache_dir = self.cache_dir / "meta"
         self.index_cache_dir = self.cache_dir / "index"
+        self._trade_dates_cache: np.ndarray | None = None
+        # Parsed per-symbol bar cache; repeated reads (backtest days, modes) slice it instead of re-reading the CSV.
+        self._bars_mem_cache: dict[str, pd.DataFrame] = {}
+        # Scans may fetch from several threads; eviction iterates the dict, so updates go through the lock.
+        self._bars_mem_cache_lock = threading.Lock()
         if self.cache_enabled:
             self.bars_cache_dir.mkdir(parents=True, exist_ok=True)
             self.meta_cache_dir.mkdir(parents=True, exist_ok=True)
@@ -78,45 +198,35 @@ class AkshareDataSource:
                     spot_df = pd.DataFrame(columns=["代码", "名称"])
                     time.sleep(0.2)
 
-        # Build union by code to avoid single-source partial lists.
-        name_map: dict[str, str] = {}
-        for _, row in names_df.iterrows():
-            code = str(row.get("code", "")).zfill(6)
-            if code and code != "000000":
-                name_map[code] = str(row.get("name", "") or "")
-        for _, row in spot_df.iterrows():
-            code = str(row.get("代码", "")).zfill(6)
-            if code and code != "000000":
-                spot_name = str(row.get("名称", "") or "")
-                if code not in name_map or not name_map[code]:
-                    name_map[code] = spot_name
-
-        if not name_map:
+        name_map = _union_code_names(names_df, spot_df)
+        if name_map.empty:
             raise RuntimeError("Failed to fetch stock universe from both name and spot sources")
 
-        items: list[StockInfo] = []
-        for symbol, name in name_map.items():
-            items.append(
-                StockInfo(
-                    symbol=symbol,
-                    name=name,
-                    listing_date=None,
-                    is_st="ST" in name.upper(),
-                    is_paused=False,
-                    market=self._guess_market(symbol),
-                )
+        items = [
+            StockInfo(
+                symbol=symbol,
+                name=name,
+                listing_date=None,
+                is_st="ST" in name.upper(),
+                is_paused=False,
+                market=self._guess_market(symbol),
             )
+            for symbol, name in zip(name_map.index.tolist(), name_map.tolist())
+        ]
         if self.cache_enabled and items:
             self._save_stock_list_cache(items)
         return items
 
     def get_trade_dates(self, start_date: date, end_date: date) -> list[date]:
-        cal = self._load_trade_calendar()
-        trade_col = pd.to_datetime(cal["trade_date"])
-        cal = cal[(trade_col >= pd.Timestamp(start_date)) & (trade_col <= pd.Timestamp(end_date))]
-        out = [_parse_trade_date(v) for v in cal["trade_date"].tolist()]
-        out.sort()
-        return out
+        if self._trade_dates_cache is None:
+            cal = self._load_trade_calendar()
+            arr = pd.to_datetime(cal["trade_date"]).to_numpy().astype("datetime64[D]")
+            arr.sort()
+            self._trade_dates_cache = arr
+        arr = self._trade_dates_cache
+        lo = np.searchsorted(arr, np.datetime64(start_date, "D"), side="left")
+        hi = np.searchsorted(arr, np.datetime64(end_date, "D"), side="right")
+        return arr[lo:hi].astype(object).tolist()
 
     def get_daily_bars(self, symbol: str, start_date: date, end_date: date) -> list[DailyBar]:
         if self.cache_enabled:
@@ -131,6 +241,14 @@ class AkshareDataSource:
             self._merge_save_bars_cache(symbol, bars)
         return bars
 
+    def get_bars_df(self, symbol: str, start_date: date, end_date: date) -> pd.DataFrame:
+        # get_daily_bars as a bars_to_df frame; cache hits go straight from the cached columns.
+        if self.cache_enabled:
+            sub = self._get_bars_frame_from_cache(symbol, start_date, end_date)
+            if sub is not None:
+                return self._cache_rows_to_df(sub)
+        return bars_to_df(self.get_daily_bars(symbol, start_date, end_date))
+
     def _fetch_remote_bars(self, symbol: str, start_date: date, end_date: date) -> list[DailyBar]:
         bars = self._get_daily_bars_em(symbol, start_date, end_date, raise_on_error=False)
         if bars:
@@ -203,39 +321,13 @@ class AkshareDataSource:
 
     @staticmethod
     def _rows_to_bars_em(df: pd.DataFrame) -> list[DailyBar]:
-        bars: list[DailyBar] = []
-        for _, row in df.iterrows():
-            bars.append(
-                DailyBar(
-                    trade_date=_parse_trade_date(row["日期"]),
-                    open=float(row["开盘"]),
-                    high=float(row["最高"]),
-                    low=float(row["最低"]),
-                    close=float(row["收盘"]),
-                    volume=float(row["成交量"]),
-                    turnover_rate=float(row["换手率"]) if "换手率" in row and pd.notna(row["换手率"]) else None,
-                )
-            )
-        bars.sort(key=lambda x: x.trade_date)
-        return bars
+        return _bars_from_columns(df, "日期", "开盘", "最高", "最低", "收盘", "成交量", "换手率")
 
     @staticmethod
     def _rows_to_bars_tx(df: pd.DataFrame) -> list[DailyBar]:
-        bars: list[DailyBar] = []
-        for _, row in df.iterrows():
-            bars.append(
-                DailyBar(
-                    trade_date=_parse_trade_date(row["date"]),
-                    open=float(row["open"]),
-                    high=float(row["high"]),
-                    low=float(row["low"]),
-                    close=float(row["close"]),
-                    volume=float(row["amount"]) if "amount" in row and pd.notna(row["amount"]) else 0.0,
-                    turnover_rate=float(row["turnover"]) if "turnover" in row and pd.notna(row["turnover"]) else None,
-                )
-            )
-        bars.sort(key=lambda x: x.trade_date)
-        return bars
+        return _bars_from_columns(
+            df, "date", "open", "high", "low", "close", "amount", "turnover", volume_default=0.0
+        )
 
     @staticmethod
     def _to_tx_symbol(symbol: str) -> str:
@@ -247,13 +339,10 @@ class AkshareDataSource:
         frame = self._get_index_frame(symbol, start_date, end_date)
         if frame.empty:
             return {}
-        out: dict[date, float] = {}
-        for _, row in frame.iterrows():
-            try:
-                out[row["trade_date"]] = float(row["close"])
-            except Exception:
-                continue
-        return out
+        closes = pd.to_numeric(frame["close"], errors="coerce")
+        valid = closes.notna().to_numpy()
+        dates = frame["trade_date"].to_numpy()[valid].tolist()
+        return dict(zip(dates, closes.to_numpy(dtype="float64")[valid].tolist()))
 
     def _index_cache_path(self, symbol: str) -> Path:
         return self.index_cache_dir / f"{symbol}.csv"
@@ -357,19 +446,23 @@ class AkshareDataSource:
             return []
         if df.empty:
             return []
-        items: list[StockInfo] = []
-        for _, row in df.iterrows():
-            items.append(
-                StockInfo(
-                    symbol=str(row.get("symbol", "")).zfill(6),
-                    name=str(row.get("name", "") or ""),
-                    listing_date=None,
-                    is_st=bool(row.get("is_st", False)),
-                    is_paused=bool(row.get("is_paused", False)),
-                    market=str(row.get("market", "") or None),
-                )
+        return [
+            StockInfo(
+                symbol=str(symbol).zfill(6),
+                name=str(name or ""),
+                listing_date=None,
+                is_st=bool(is_st),
+                is_paused=bool(is_paused),
+                market=str(market or None),
             )
-        return items
+            for symbol, name, is_st, is_paused, market in zip(
+                _column_list(df, "symbol", ""),
+                _column_list(df, "name", ""),
+                _column_list(df, "is_st", False),
+                _column_list(df, "is_paused", False),
+                _column_list(df, "market", ""),
+            )
+        ]
 
     def _save_stock_list_cache(self, stocks: list[StockInfo]) -> None:
         path = self._stock_list_cache_path()
@@ -388,33 +481,52 @@ class AkshareDataSource:
         return self.bars_cache_dir / f"{symbol}.csv"
 
     def _get_bars_from_cache(self, symbol: str, start_date: date, end_date: date) -> list[DailyBar] | None:
+        sub = self._get_bars_frame_from_cache(symbol, start_date, end_date)
+        if sub is None:
+            return None
+        if sub.empty:
+            return []
+        return self._rows_to_bars_cache(sub)
+
+    def _get_bars_frame_from_cache(self, symbol: str, start_date: date, end_date: date) -> pd.DataFrame | None:
+        df = self._bars_mem_cache.get(symbol)
+        if df is None:
+            df = self._load_bars_df(symbol)
+            if df is None:
+                return None
+            self._remember_bars_df(symbol, df)
+        cached_min = df["trade_date"].min().date()
+        cached_max = df["trade_date"].max().date()
+        need_remote = start_date < cached_min or end_date > cached_max
+        if need_remote:
+            # Incrementally backfill missing left/right range.
+            merged = self._incremental_fill_cache(symbol, df, start_date, end_date, cached_min, cached_max)
+            if merged is not None:
+                df = merged
+                self._remember_bars_df(symbol, df)
+        mask = (df["trade_date"] >= pd.Timestamp(start_date)) & (df["trade_date"] <= pd.Timestamp(end_date))
+        return df[mask]
+
+    def _load_bars_df(self, symbol: str) -> pd.DataFrame | None:
         path = self._bars_cache_path(symbol)
         if not path.exists():
             return None
         try:
-            df = pd.read_csv(path)
+            df = _read_bars_csv(path)
         except Exception:
             return None
-        if df.empty:
-            return None
-        df["trade_date"] = pd.to_datetime(df["trade_date"], errors="coerce").dt.date
+        # trade_date stays datetime64 through the merge; it is only stringified when written back.
         df = df.dropna(subset=["trade_date"]).reset_index(drop=True)
         if df.empty:
             return None
-        cached_min = df["trade_date"].min()
-        cached_max = df["trade_date"].max()
-        need_remote = start_date < cached_min or end_date > cached_max
-        if need_remote:
-            # Incrementally backfill missing left/right range.
-            merged = self._incremental_fill_cache(symbol, df, start_date, end_date, cached_min, cached_max)
-            if merged is not None:
-                df = merged
-        df["trade_date"] = pd.to_datetime(df["trade_date"], errors="coerce").dt.date
-        df = df.dropna(subset=["trade_date"]).reset_index(drop=True)
-        sub = df[(df["trade_date"] >= start_date) & (df["trade_date"] <= end_date)].copy()
-        if sub.empty:
-            return []
-        return self._rows_to_bars_cache(sub)
+        return df
+
+    def _remember_bars_df(self, symbol: str, df: pd.DataFrame) -> None:
+        with self._bars_mem_cache_lock:
+            if symbol not in self._bars_mem_cache and len(self._bars_mem_cache) >= _BARS_MEM_CACHE_SIZE:
+                # Evict the oldest entry to bound memory on full-universe scans.
+                self._bars_mem_cache.pop(next(iter(self._bars_mem_cache)), None)
+            self._bars_mem_cache[symbol] = df
 
     def _incremental_fill_cache(
         self,
@@ -440,23 +552,8 @@ class AkshareDataSource:
                 pass
         if not fetched:
             return None
-        df_local = df.copy()
-        df_local["trade_date"] = pd.to_datetime(df_local["trade_date"], errors="coerce").dt.strftime("%Y-%m-%d")
-        df_local = df_local.dropna(subset=["trade_date"]).reset_index(drop=True)
-        fetched_df = pd.DataFrame(
-            {
-                "trade_date": [b.trade_date.isoformat() for b in fetched],
-                "open": [b.open for b in fetched],
-                "high": [b.high for b in fetched],
-                "low": [b.low for b in fetched],
-                "close": [b.close for b in fetched],
-                "volume": [b.volume for b in fetched],
-                "turnover_rate": [b.turnover_rate for b in fetched],
-            }
-        )
-        bar_columns = ["trade_date", "open", "high", "low", "close", "volume", "turnover_rate"]
         frames = []
-        for frame in (df_local, fetched_df):
+        for frame in (df, _bars_frame(fetched)):
             if frame.empty:
                 continue
             # Drop all-NA columns before concat to avoid pandas future dtype inference warning.
@@ -464,79 +561,58 @@ class AkshareDataSource:
         if not frames:
             return None
         merged = frames[0].copy() if len(frames) == 1 else pd.concat(frames, ignore_index=True)
-        for col in bar_columns:
+        for col in _BAR_COLUMNS:
             if col not in merged.columns:
                 merged[col] = pd.NA
-        merged = merged[bar_columns]
-        merged["trade_date"] = pd.to_datetime(merged["trade_date"], errors="coerce").dt.strftime("%Y-%m-%d")
-        merged = merged.dropna(subset=["trade_date"])
-        merged = merged.drop_duplicates(subset=["trade_date"], keep="last").sort_values("trade_date").reset_index(drop=True)
+        merged = merged[_BAR_COLUMNS].dropna(subset=["trade_date"])
+        merged = _dedup_cached_first(merged)
         self._save_bars_df(symbol, merged)
-        merged["trade_date"] = pd.to_datetime(merged["trade_date"], errors="coerce").dt.date
-        merged = merged.dropna(subset=["trade_date"]).reset_index(drop=True)
         return merged
 
     def _merge_save_bars_cache(self, symbol: str, bars: list[DailyBar]) -> None:
-        new_df = pd.DataFrame(
-            {
-                "trade_date": [b.trade_date.isoformat() for b in bars],
-                "open": [b.open for b in bars],
-                "high": [b.high for b in bars],
-                "low": [b.low for b in bars],
-                "close": [b.close for b in bars],
-                "volume": [b.volume for b in bars],
-                "turnover_rate": [b.turnover_rate for b in bars],
-            }
-        )
+        new_df = _bars_frame(bars)
         path = self._bars_cache_path(symbol)
+        out = new_df
         if path.exists():
             try:
-                old = pd.read_csv(path)
-                old["trade_date"] = pd.to_datetime(old["trade_date"], errors="coerce").dt.strftime("%Y-%m-%d")
-                frames = [frame for frame in (old, new_df) if not frame.empty]
-                if not frames:
-                    out = new_df
-                else:
-                    out = frames[0].copy() if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+                old = _read_bars_csv(path)
             except Exception:
-                out = new_df
-        else:
-            out = new_df
-        out["trade_date"] = pd.to_datetime(out["trade_date"], errors="coerce").dt.strftime("%Y-%m-%d")
-        out = out.dropna(subset=["trade_date"])
-        out = out.drop_duplicates(subset=["trade_date"], keep="last").sort_values("trade_date").reset_index(drop=True)
+                old = None
+            if old is not None and not old.empty:
+                out = old if new_df.empty else pd.concat([old, new_df], ignore_index=True)
+        out = _dedup_cached_first(out.dropna(subset=["trade_date"]))
         self._save_bars_df(symbol, out)
 
     def _save_bars_df(self, symbol: str, df: pd.DataFrame) -> None:
+        with self._bars_mem_cache_lock:
+            self._bars_mem_cache.pop(symbol, None)
         path = self._bars_cache_path(symbol)
-        df.to_csv(path, index=False)
+        df.assign(trade_date=df["trade_date"].dt.strftime("%Y-%m-%d")).to_csv(path, index=False)
 
     @staticmethod
     def _rows_to_bars_cache(df: pd.DataFrame) -> list[DailyBar]:
-        bars: list[DailyBar] = []
-        for _, row in df.iterrows():
-            bars.append(
-                DailyBar(
-                    trade_date=_parse_trade_date(row["trade_date"]),
-                    open=float(row["open"]),
-                    high=float(row["high"]),
-                    low=float(row["low"]),
-                    close=float(row["close"]),
-                    volume=float(row["volume"]),
-                    turnover_rate=float(row["turnover_rate"]) if pd.notna(row.get("turnover_rate")) else None,
-                )
-            )
-        bars.sort(key=lambda x: x.trade_date)
-        return bars
+        return _bars_from_columns(
+            df, "trade_date", "open", "high", "low", "close", "volume", "turnover_rate"
+        )
+
+    @classmethod
+    def _cache_rows_to_df(cls, df: pd.DataFrame) -> pd.DataFrame:
+        # Same frame as bars_to_df(_rows_to_bars_cache(df)) without the per-row DailyBar objects.
+        if df.empty or not df["trade_date"].is_monotonic_increasing:
+            return bars_to_df(cls._rows_to_bars_cache(df))
+        turnovers = _float_column(df, "turnover_rate")
+        return pd.DataFrame(
+            {
+                "trade_date": df["trade_date"].dt.date.tolist(),
+                "open": df["open"].to_numpy(dtype="float64"),
+                "high": df["high"].to_numpy(dtype="float64"),
+                "low": df["low"].to_numpy(dtype="float64"),
+                "close": df["close"].to_numpy(dtype="float64"),
+                "volume": df["volume"].to_numpy(dtype="float64"),
+                "turnover_rate": [None if t != t else t for t in turnovers],
+            }
+        )
 
     @staticmethod
     def _guess_market(symbol: str) -> str:
-        if symbol.startswith(("600", "601", "603", "605")):
-            return "SH"
-        if symbol.startswith("688"):
-            return "STAR"
-        if symbol.startswith(("000", "001", "002", "003", "300")):
-            return "SZ"
-        if symbol.startswith(("4", "8")):
-            return "BJ"
-        return "OTHER"
+        return _MARKET_BY_PREFIX.get(symbol[:3]) or _MARKET_BY_FIRST_CHAR.get(symbol[:1], "OTHER")
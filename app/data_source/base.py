@@ -3,6 +3,8 @@ from __future__ import annotations
 from datetime import date
 from typing import Protocol
 
+import pandas as pd
+
 from app.models import DailyBar, StockInfo
 
 
@@ -19,3 +21,8 @@ class MarketDataSource(Protocol):
     def get_index_closes(self, symbol: str, start_date: date, end_date: date) -> dict[date, float]:
         ...
 
+
+class BarFrameSource(Protocol):
+    # Optional: daily bars as the frame bars_to_df builds (same columns, chronological). Preferred when present.
+    def get_bars_df(self, symbol: str, start_date: date, end_date: date) -> pd.DataFrame:
+        ...
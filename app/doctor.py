@@ -3,20 +3,26 @@ from __future__ import annotations
 import platform
 import socket
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 
 import requests
+
 from app.error_messages import friendly_error_message
-from app.network import get_proxy_env
+from app.network import get_proxy_env, get_thread_session
+
+_ak: Any = None
+
 
-try:
-    import akshare as ak
-except ImportError as exc:  # pragma: no cover
-    ak = None
-    _AK_ERROR = exc
-else:
-    _AK_ERROR = None
+def _import_akshare() -> Any:
+    # akshare is heavy to import; only the two akshare checks need it.
+    global _ak
+    if _ak is None:
+        import akshare
+
+        _ak = akshare
+    return _ak
 
 
 def _dns_check(host: str) -> dict[str, Any]:
@@ -27,17 +33,28 @@ def _dns_check(host: str) -> dict[str, Any]:
         return {"ok": False, "host": host, "error": f"{type(exc).__name__}: {exc}"}
 
 
-def _http_check(url: str, timeout_sec: int = 10) -> dict[str, Any]:
+def _http_check(
+    url: str, timeout: tuple[float, float] = (3.0, 7.0), pool: tuple[int, int] = (8, 32)
+) -> dict[str, Any]:
+    # Reachability only: HEAD skips the body, and (connect, read) timeouts keep a slow server from stalling doctor.
+    # Probes run concurrently, so each uses its own thread's session (requests.Session is not thread-safe).
+    session = get_thread_session(*pool)
     try:
-        resp = requests.get(url, timeout=timeout_sec)
+        resp = session.head(url, timeout=timeout, allow_redirects=True)
+        if resp.status_code in (405, 501):
+            # Server rejects HEAD; fall back to GET but close before reading the body.
+            resp = session.get(url, timeout=timeout, stream=True)
+            resp.close()
         return {"ok": True, "url": url, "status_code": resp.status_code}
     except Exception as exc:
         return {"ok": False, "url": url, "error": f"{type(exc).__name__}: {exc}"}
 
 
 def _akshare_trade_date_check() -> dict[str, Any]:
-    if ak is None:
-        return {"ok": False, "check": "akshare_trade_dates", "error": f"ImportError: {_AK_ERROR}"}
+    try:
+        ak = _import_akshare()
+    except ImportError as exc:
+        return {"ok": False, "check": "akshare_trade_dates", "error": f"ImportError: {exc}"}
     try:
         df = ak.tool_trade_date_hist_sina()
         return {
@@ -50,8 +67,10 @@ def _akshare_trade_date_check() -> dict[str, Any]:
 
 
 def _akshare_spot_check() -> dict[str, Any]:
-    if ak is None:
-        return {"ok": False, "check": "akshare_spot", "error": f"ImportError: {_AK_ERROR}"}
+    try:
+        ak = _import_akshare()
+    except ImportError as exc:
+        return {"ok": False, "check": "akshare_spot", "error": f"ImportError: {exc}"}
     try:
         df = ak.stock_zh_a_spot_em()
         sample = []
@@ -69,20 +88,30 @@ def _akshare_spot_check() -> dict[str, Any]:
         return {"ok": False, "check": "akshare_spot", "error": f"{type(exc).__name__}: {exc}"}
 
 
-def run_doctor() -> dict[str, Any]:
+def run_doctor(cfg: dict[str, Any] | None = None) -> dict[str, Any]:
+    doctor_cfg = (cfg or {}).get("doctor", {})
+    pool = (int(doctor_cfg.get("pool_connections", 8)), int(doctor_cfg.get("pool_maxsize", 32)))
+    http_timeout = (
+        float(doctor_cfg.get("connect_timeout_sec", 3)),
+        float(doctor_cfg.get("read_timeout_sec", 7)),
+    )
     proxy_env = get_proxy_env()
     requests_proxy_view = {
         "finance.sina.com.cn": requests.utils.get_environ_proxies("https://finance.sina.com.cn"),
         "82.push2.eastmoney.com": requests.utils.get_environ_proxies("https://82.push2.eastmoney.com"),
     }
-    checks = [
-        {"required": True, **_dns_check("finance.sina.com.cn")},
-        {"required": True, **_dns_check("82.push2.eastmoney.com")},
-        {"required": True, **_http_check("https://finance.sina.com.cn")},
-        {"required": True, **_http_check("https://82.push2.eastmoney.com")},
-        {"required": True, **_akshare_trade_date_check()},
-        {"required": False, **_akshare_spot_check()},
+    probes = [
+        (True, _dns_check, "finance.sina.com.cn"),
+        (True, _dns_check, "82.push2.eastmoney.com"),
+        (True, _http_check, "https://finance.sina.com.cn", http_timeout, pool),
+        (True, _http_check, "https://82.push2.eastmoney.com", http_timeout, pool),
+        (True, _akshare_trade_date_check),
+        (False, _akshare_spot_check),
     ]
+    # Checks are independent network probes; run them together so total latency is the slowest one, not the sum.
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = [(required, executor.submit(fn, *args)) for required, fn, *args in probes]
+        checks = [{"required": required, **future.result()} for required, future in futures]
     for item in checks:
         if not item.get("ok") and item.get("error"):
             item["error_cn"] = friendly_error_message(str(item["error"]))
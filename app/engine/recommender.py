@@ -1,19 +1,60 @@
 from __future__ import annotations
 
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
 
 from app.data_source.base import MarketDataSource
 from app.error_messages import friendly_error_message
-from app.features.indicators import add_indicators, bars_to_df
+from app.features.indicators import INDICATOR_WARMUP_BARS, add_indicators, bars_to_df
 from app.models import CandidateScore, RecommendationResult
 from app.strategy.holding_period import suggest_holding_days
-from app.strategy.regime_risk import MarketState, detect_market_state, passes_risk_filter
+from app.strategy.regime_risk import MarketState, detect_market_state, passes_risk_filter, passes_risk_filter_batch
 from app.strategy.risk_targets import compute_stop_take_prices
-from app.strategy.scoring import build_reason, compute_score, passes_threshold
+from app.strategy.scoring import (
+    ScoreWeights,
+    build_reason,
+    compute_score,
+    compute_score_batch,
+    passes_threshold,
+    passes_threshold_batch,
+    threshold_from_mode,
+)
 from app.universe.filtering import filter_universe
 
 MODE_ZH = {"normal": "常规", "relaxed": "放宽", "force": "强制"}
+_MIN_BARS = 70
+_MIN_BARS_FORCE = 30
+_BAR_LOOKBACK_DAYS = 220
+
+
+def _quick_prefilter(quick: tuple[float, float, float] | None, mode: str) -> bool:
+    # The close/ma20/mom20 part of passes_threshold, from three scalars; False only when passes_threshold would be.
+    if quick is None or mode == "force":
+        return True
+    close, ma20, mom20 = quick
+    if np.isnan(ma20) or close <= ma20:
+        return False
+    return not mom20 <= threshold_from_mode(mode).min_mom20
+
+
+def _quick_scalars(close: np.ndarray) -> tuple[float, float, float] | None:
+    if close.shape[0] < 21:
+        return None
+    return float(close[-1]), float(close[-20:].mean()), float(close[-1] / close[-21] - 1.0)
+
+
+def _latest_indicator_row(df: pd.DataFrame) -> dict | None:
+    df = add_indicators(df)
+    if df.empty:
+        return None
+    # Plain dict: the filters and scoring read it by key many times, and dict lookups are far cheaper.
+    return df.iloc[-1].to_dict()
 
 
 class Recommender:
@@ -21,11 +62,23 @@ class Recommender:
         self.data_source = data_source
         self.cfg = cfg
         self._stock_name_map: dict[str, str] | None = None
+        self._score_weights = ScoreWeights.from_cfg(cfg)
         self._last_run_meta: dict | None = None
+        # Both results only depend on the signal date (and config) within one Recommender's lifetime.
+        self._market_state_cache: dict[tuple, tuple[MarketState, str]] = {}
+        self._freshness_cache: dict[tuple, tuple[bool, str]] = {}
+        # Set by a backtest: signal dates inside the window read each symbol's indicators from one
+        # frame built over the whole window instead of re-fetching and recomputing them every day.
+        self._feature_window: tuple[date, date] | None = None
+        self._feature_cache: dict[str, tuple[np.ndarray, np.ndarray, dict[str, list]]] = {}
 
     def get_last_run_meta(self) -> dict | None:
         return self._last_run_meta
 
+    def set_feature_window(self, window: tuple[date, date] | None) -> None:
+        self._feature_window = window
+        self._feature_cache.clear()
+
     def resolve_signal_date(self, target_date: date) -> date:
         start = target_date - timedelta(days=30)
         dates = self.data_source.get_trade_dates(start, target_date)
@@ -48,6 +101,9 @@ class Recommender:
                 raise RuntimeError(f"数据未更新，已停止执行: {freshness_msg}")
         market_state, market_reason = self._resolve_market_state(signal_date)
         stocks = self.data_source.get_stock_list()
+        if self._stock_name_map is None:
+            # Lets a later explain() resolve names without fetching the stock list again.
+            self._stock_name_map = {s.symbol: s.name for s in stocks}
         stocks_total = len(stocks)
         universe = filter_universe(stocks, self.cfg, signal_date)
         filtered_total = len(universe)
@@ -67,8 +123,13 @@ class Recommender:
         stats_by_mode: dict[str, dict] = {}
         candidates: list[CandidateScore] = []
         mode = enabled_modes[0]
+        # Fallback modes rescan the same universe; bars and indicators are shared across them.
+        scan_cache: dict[str, tuple] = {}
+        pick_count = self._resolve_pick_count(count)
         for m in enabled_modes:
-            candidates, mode_stats = self._rank_candidates(universe, signal_date, mode=m, market_state=market_state)
+            candidates, mode_stats = self._rank_candidates(
+                universe, signal_date, mode=m, market_state=market_state, scan_cache=scan_cache, limit=pick_count
+            )
             stats_by_mode[m] = mode_stats
             mode = m
             if candidates:
@@ -80,21 +141,21 @@ class Recommender:
             if mode_stats is None:
                 continue
             self._print_mode_stats(m, mode_stats)
-        pick_count = self._resolve_pick_count(count)
         selected = candidates[:pick_count]
+        available = int(stats_by_mode[mode]["scored"])
         self._last_run_meta = {
             "target_date": target_date.isoformat(),
             "signal_date": signal_date.isoformat(),
             "final_mode": mode,
             "enabled_modes": enabled_modes,
             "selected_count": len(selected),
-            "available_candidates": len(candidates),
+            "available_candidates": available,
             "normal_scored": int(stats_by_mode.get("normal", {}).get("scored", 0)) if "normal" in enabled_modes else None,
             "relaxed_scored": int(stats_by_mode.get("relaxed", {}).get("scored", 0)) if "relaxed" in enabled_modes else None,
             "force_scored": int(stats_by_mode.get("force", {}).get("scored", 0)) if "force" in enabled_modes else None,
         }
         print(
-            f"[推荐] 完成，用时 {time.time() - t0:.1f}s，候选数={len(candidates)}，选中={len(selected)}，最终模式={MODE_ZH.get(mode, mode)}",
+            f"[推荐] 完成，用时 {time.time() - t0:.1f}s，候选数={available}，选中={len(selected)}，最终模式={MODE_ZH.get(mode, mode)}",
             flush=True,
         )
         return [
@@ -134,6 +195,13 @@ class Recommender:
             return True, "disabled"
         probe_symbol = str(cfg.get("probe_symbol", "000001"))
         lookback_days = int(cfg.get("probe_lookback_days", 10))
+        key = (probe_symbol, signal_date, lookback_days)
+        cached = self._freshness_cache.get(key)
+        if cached is None:
+            cached = self._freshness_cache[key] = self._probe_signal_data_freshness(probe_symbol, signal_date, lookback_days)
+        return cached
+
+    def _probe_signal_data_freshness(self, probe_symbol: str, signal_date: date, lookback_days: int) -> tuple[bool, str]:
         start = signal_date - timedelta(days=max(lookback_days, 3))
         try:
             bars = self.data_source.get_daily_bars(probe_symbol, start, signal_date)
@@ -153,16 +221,15 @@ class Recommender:
     def explain(self, symbol: str, target_date: date, mode: str = "normal") -> CandidateScore:
         signal_date = self.resolve_signal_date(target_date)
         market_state, _ = self._resolve_market_state(signal_date)
-        bars = self._fetch_recent_bars(symbol, signal_date)
-        df = add_indicators(bars_to_df(bars))
+        df = add_indicators(self._fetch_recent_df(symbol, signal_date))
         if df.empty:
             raise RuntimeError(f"No bars found for {symbol}")
-        latest = df.iloc[-1]
+        latest = df.iloc[-1].to_dict()
         if not passes_threshold(latest, mode):
             raise RuntimeError(f"{symbol} does not pass {mode} threshold")
         if not passes_risk_filter(latest, market_state, mode, self.cfg):
             raise RuntimeError(f"{symbol} does not pass risk filter in {mode} mode")
-        total, breakdown = compute_score(latest, self.cfg)
+        total, breakdown = compute_score(latest, self._score_weights)
         return CandidateScore(
             symbol=symbol,
             name=self._resolve_stock_name(symbol),
@@ -174,10 +241,8 @@ class Recommender:
 
     def _resolve_stock_name(self, symbol: str) -> str:
         if self._stock_name_map is None:
-            self._stock_name_map = {}
             try:
-                for stock in self.data_source.get_stock_list():
-                    self._stock_name_map[stock.symbol] = stock.name
+                self._stock_name_map = {stock.symbol: stock.name for stock in self.data_source.get_stock_list()}
             except Exception:
                 # Keep explain resilient even when stock list API is unavailable.
                 self._stock_name_map = {}
@@ -189,10 +254,21 @@ class Recommender:
         signal_date: date,
         mode: str,
         market_state: MarketState,
+        scan_cache: dict[str, tuple] | None = None,
+        limit: int | None = None,
     ) -> tuple[list[CandidateScore], dict]:
+        # Returns the passing candidates best first (only the top `limit` when given); stats["scored"] counts all.
+        if scan_cache is None:
+            scan_cache = {}
         out: list[CandidateScore] = []
+        survivors: list[tuple] = []
         total_symbols = len(universe)
-        progress_every = int(self.cfg.get("strategy", {}).get("progress_every", 10))
+        strategy_cfg = self.cfg.get("strategy", {})
+        progress_every = int(strategy_cfg.get("progress_every", 10))
+        failed_example_limit = int(strategy_cfg.get("failed_symbol_examples", 20))
+        market_filter_enabled = bool(self.cfg.get("market_filter", {}).get("enabled", True))
+        is_force = mode == "force"
+        min_bars = _MIN_BARS_FORCE if is_force else _MIN_BARS
         data_fresh_cfg = self.cfg.get("data_freshness", {}) if isinstance(self.cfg.get("data_freshness", {}), dict) else {}
         # Per-stock staleness often means suspension/停牌; don't abort unless explicitly configured.
         stock_stop_on_stale = bool(data_fresh_cfg.get("stop_on_stale_stock", False))
@@ -206,100 +282,111 @@ class Recommender:
             "no_bars_symbols": [],
             "insufficient_bars": 0,
             "df_empty": 0,
+            "prefilter_reject": 0,
             "threshold_reject": 0,
             "risk_reject": 0,
             "market_reject": 0,
             "scored": 0,
         }
-        for idx, stock in enumerate(universe, start=1):
-            try:
-                bars = self._fetch_recent_bars(stock.symbol, signal_date)
-            except Exception as exc:
-                stats["kline_failed"] += 1
-                if len(stats["kline_failed_examples"]) < int(
-                    self.cfg.get("strategy", {}).get("failed_symbol_examples", 20)
-                ):
-                    stats["kline_failed_examples"].append(
-                        {"symbol": stock.symbol, "reason": friendly_error_message(exc)}
+        fetch_workers = int(strategy_cfg.get("fetch_workers", 1))
+        # closing(): an abort mid-scan (stale stock) shuts the fetch pool down right away instead of when the
+        # generator is collected; a caller holding the exception's traceback would otherwise keep it alive.
+        with contextlib.closing(self._iter_scans(universe, signal_date, mode, scan_cache, fetch_workers)) as scans:
+            for idx, (stock, scanned) in enumerate(scans, start=1):
+                # Rejections `continue` out early; the finally clause logs progress once for every symbol.
+                try:
+                    exc, bar_count, latest_stock_date, quick, latest, pending_df = scanned
+                    if exc is not None:
+                        stats["kline_failed"] += 1
+                        if len(stats["kline_failed_examples"]) < failed_example_limit:
+                            stats["kline_failed_examples"].append(
+                                {"symbol": stock.symbol, "reason": friendly_error_message(exc)}
+                            )
+                        continue
+                    if not bar_count:
+                        stats["no_bars"] += 1
+                        if len(stats["no_bars_symbols"]) < failed_example_limit:
+                            stats["no_bars_symbols"].append(stock.symbol)
+                        continue
+                    if latest_stock_date < signal_date:
+                        stale_msg = (
+                            f"Stock data stale: symbol={stock.symbol}, signal_date={signal_date}, latest={latest_stock_date}"
+                        )
+                        stale_days = (signal_date - latest_stock_date).days
+                        treat_as_suspended = suspend_days > 0 and stale_days >= suspend_days
+                        if stock_stop_on_stale and not treat_as_suspended:
+                            raise RuntimeError(stale_msg)
+                        if treat_as_suspended:
+                            print(f"[警告] {stale_msg}（可能停牌，已跳过）", flush=True)
+                        else:
+                            print(f"[警告] {stale_msg}（数据滞后，已跳过）", flush=True)
+                        continue
+                    stats["kline_success"] += 1
+                    if bar_count < min_bars:
+                        stats["insufficient_bars"] += 1
+                        continue
+                    if not is_force and not _quick_prefilter(quick, mode):
+                        stats["prefilter_reject"] += 1
+                        continue
+                    if pending_df is not None:
+                        # Skipped by an earlier, stricter mode's prefilter; compute the indicators now.
+                        latest = _latest_indicator_row(pending_df)
+                        scan_cache[stock.symbol] = (exc, bar_count, latest_stock_date, quick, latest, None)
+                    if latest is None:
+                        stats["df_empty"] += 1
+                        continue
+                    survivors.append((stock, latest))
+                finally:
+                    self._maybe_log_progress(mode, idx, total_symbols, len(survivors), progress_every)
+        if survivors:
+            # Threshold, risk filter and score for all survivors in one vectorized pass over their latest rows.
+            latest_rows = [row for _, row in survivors]
+            rows = pd.DataFrame.from_records(latest_rows)
+            passed = np.ones(len(rows), dtype=bool)
+            if not is_force:
+                passed = passes_threshold_batch(rows, mode)
+                stats["threshold_reject"] = int(len(rows) - passed.sum())
+            risk_ok = passes_risk_filter_batch(rows, market_state, mode, self.cfg, latest_rows=latest_rows)
+            risk_rejects = int((passed & ~risk_ok).sum())
+            if not is_force and market_filter_enabled and market_state.label == "bear":
+                stats["market_reject"] = risk_rejects
+            else:
+                stats["risk_reject"] = risk_rejects
+            passed &= risk_ok
+            stats["scored"] = int(passed.sum())
+            totals, components = compute_score_batch(rows, self._score_weights)
+            score_list = totals.tolist()
+            # Stable sort, so equal scores keep universe order; breakdown, metrics and reasons are
+            # only built for the candidates that are returned.
+            ranked = sorted(np.flatnonzero(passed).tolist(), key=score_list.__getitem__, reverse=True)
+            for i in ranked[:limit]:
+                stock, latest = survivors[i]
+                breakdown = {name: float(values[i]) for name, values in components.items()}
+                out.append(
+                    CandidateScore(
+                        symbol=stock.symbol,
+                        name=stock.name,
+                        score_total=score_list[i],
+                        score_breakdown=breakdown,
+                        key_metrics=self._build_metrics(latest, market_state),
+                        reason=build_reason(latest, breakdown, mode),
                     )
-                if progress_every > 0 and (idx % progress_every == 0 or idx == total_symbols):
-                    print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total_symbols}，候选={len(out)}", flush=True)
-                continue
-            if not bars:
-                stats["no_bars"] += 1
-                if len(stats["no_bars_symbols"]) < int(self.cfg.get("strategy", {}).get("failed_symbol_examples", 20)):
-                    stats["no_bars_symbols"].append(stock.symbol)
-                if progress_every > 0 and (idx % progress_every == 0 or idx == total_symbols):
-                    print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total_symbols}，候选={len(out)}", flush=True)
-                continue
-            latest_stock_date = max(b.trade_date for b in bars)
-            if latest_stock_date < signal_date:
-                stale_msg = (
-                    f"Stock data stale: symbol={stock.symbol}, signal_date={signal_date}, latest={latest_stock_date}"
-                )
-                stale_days = (signal_date - latest_stock_date).days
-                treat_as_suspended = suspend_days > 0 and stale_days >= suspend_days
-                if stock_stop_on_stale and not treat_as_suspended:
-                    raise RuntimeError(stale_msg)
-                if treat_as_suspended:
-                    print(f"[警告] {stale_msg}（可能停牌，已跳过）", flush=True)
-                else:
-                    print(f"[警告] {stale_msg}（数据滞后，已跳过）", flush=True)
-                if progress_every > 0 and (idx % progress_every == 0 or idx == total_symbols):
-                    print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total_symbols}，候选={len(out)}", flush=True)
-                continue
-            stats["kline_success"] += 1
-            min_bars = 70 if mode != "force" else 30
-            if len(bars) < min_bars:
-                stats["insufficient_bars"] += 1
-                if progress_every > 0 and (idx % progress_every == 0 or idx == total_symbols):
-                    print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total_symbols}，候选={len(out)}", flush=True)
-                continue
-            df = add_indicators(bars_to_df(bars))
-            if df.empty:
-                stats["df_empty"] += 1
-                if progress_every > 0 and (idx % progress_every == 0 or idx == total_symbols):
-                    print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total_symbols}，候选={len(out)}", flush=True)
-                continue
-            latest = df.iloc[-1]
-            if mode != "force" and not passes_threshold(latest, mode):
-                stats["threshold_reject"] += 1
-                if progress_every > 0 and (idx % progress_every == 0 or idx == total_symbols):
-                    print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total_symbols}，候选={len(out)}", flush=True)
-                continue
-            if not passes_risk_filter(latest, market_state, mode, self.cfg):
-                market_enabled = bool(self.cfg.get("market_filter", {}).get("enabled", True))
-                if mode != "force" and market_enabled and market_state.label == "bear":
-                    stats["market_reject"] += 1
-                else:
-                    stats["risk_reject"] += 1
-                if progress_every > 0 and (idx % progress_every == 0 or idx == total_symbols):
-                    print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total_symbols}，候选={len(out)}", flush=True)
-                continue
-            score_total, breakdown = compute_score(latest, self.cfg)
-            out.append(
-                CandidateScore(
-                    symbol=stock.symbol,
-                    name=stock.name,
-                    score_total=score_total,
-                    score_breakdown=breakdown,
-                    key_metrics=self._build_metrics(latest, market_state),
-                    reason=build_reason(latest, breakdown, mode),
                 )
-            )
-            stats["scored"] += 1
-            if progress_every > 0 and (idx % progress_every == 0 or idx == total_symbols):
-                print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total_symbols}，候选={len(out)}", flush=True)
-        out.sort(key=lambda x: x.score_total, reverse=True)
         return out, stats
 
+    @staticmethod
+    def _maybe_log_progress(mode: str, idx: int, total: int, pending: int, every: int) -> None:
+        if every > 0 and (idx % every == 0 or idx == total):
+            print(f"[{MODE_ZH.get(mode, mode)}] 已扫描 {idx}/{total}，待评估={pending}", flush=True)
+
     @staticmethod
     def _print_mode_stats(mode: str, stats: dict) -> None:
         print(
             f"[{MODE_ZH.get(mode, mode)}][统计] 总扫描={stats['scanned']} "
             f"K线成功={stats['kline_success']} K线失败={stats['kline_failed']} "
             f"无K线={stats['no_bars']} 历史不足={stats['insufficient_bars']} "
-            f"指标空表={stats['df_empty']} 阈值淘汰={stats['threshold_reject']} "
+            f"指标空表={stats['df_empty']} 预筛淘汰={stats.get('prefilter_reject', 0)} "
+            f"阈值淘汰={stats['threshold_reject']} "
             f"风控淘汰={stats['risk_reject']} 市场淘汰={stats['market_reject']} "
             f"入选={stats['scored']}",
             flush=True,
@@ -317,10 +404,20 @@ class Recommender:
         mcfg = self.cfg.get("market_filter", {})
         if not bool(mcfg.get("enabled", True)):
             return MarketState(label="unknown", close=0.0, ma20=0.0, ma60=0.0, mom20=0.0), "market_filter_disabled"
-        fail_on_error = bool(mcfg.get("fail_on_error", False))
-        stop_on_stale = bool(mcfg.get("stop_on_stale", True))
         index_symbol = str(mcfg.get("index_symbol", "000300"))
         lookback = int(mcfg.get("lookback_days", 120))
+        key = (index_symbol, signal_date, lookback)
+        cached = self._market_state_cache.get(key)
+        if cached is None:
+            # Raised errors are not cached, so a retry hits the data source again.
+            cached = self._market_state_cache[key] = self._load_market_state(mcfg, index_symbol, signal_date, lookback)
+        return cached
+
+    def _load_market_state(
+        self, mcfg: dict, index_symbol: str, signal_date: date, lookback: int
+    ) -> tuple[MarketState, str]:
+        fail_on_error = bool(mcfg.get("fail_on_error", False))
+        stop_on_stale = bool(mcfg.get("stop_on_stale", True))
         start = signal_date - timedelta(days=max(lookback * 2, 180))
         try:
             closes = self.data_source.get_index_closes(index_symbol, start, signal_date)
@@ -351,10 +448,99 @@ class Recommender:
                 ) from exc
             return MarketState(label="unknown", close=0.0, ma20=0.0, ma60=0.0, mom20=0.0), f"index_error:{type(exc).__name__}"
 
-    def _fetch_recent_bars(self, symbol: str, signal_date: date):
-        start = signal_date - timedelta(days=220)
-        bars = self.data_source.get_daily_bars(symbol, start, signal_date)
-        return [b for b in bars if b.trade_date <= signal_date]
+    def _iter_scans(
+        self, universe, signal_date: date, mode: str, scan_cache: dict[str, tuple], fetch_workers: int
+    ) -> Iterator[tuple]:
+        pending = list(dict.fromkeys(s.symbol for s in universe if s.symbol not in scan_cache))
+        if fetch_workers <= 1 or len(pending) <= 1:
+            for stock in universe:
+                scanned = scan_cache.get(stock.symbol)
+                if scanned is None:
+                    scanned = scan_cache[stock.symbol] = self._scan_symbol(stock.symbol, signal_date, mode)
+                yield stock, scanned
+            return
+        # Bar fetches are network-bound; run them ahead in threads and consume in universe order.
+        executor = ThreadPoolExecutor(max_workers=fetch_workers)
+        try:
+            futures = {symbol: executor.submit(self._scan_symbol, symbol, signal_date, mode) for symbol in pending}
+            for stock in universe:
+                scanned = scan_cache.get(stock.symbol)
+                if scanned is None:
+                    scanned = scan_cache[stock.symbol] = futures[stock.symbol].result()
+                yield stock, scanned
+        finally:
+            # A stale-stock abort leaves the scan early; drop fetches that have not started yet.
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _scan_symbol(self, symbol: str, signal_date: date, mode: str) -> tuple:
+        # Returns (fetch_error, bar_count, latest_bar_date, prefilter_scalars, latest_indicator_row, pending_df).
+        # Indicators are only computed for symbols that pass mode's prefilter; the others keep their bar
+        # frame in pending_df so a looser fallback mode can still compute them.
+        window = self._feature_window
+        if window is not None and window[0] <= signal_date <= window[1]:
+            return self._scan_cached_symbol(symbol, signal_date)
+        try:
+            df = self._fetch_recent_df(symbol, signal_date)
+        except Exception as exc:
+            return exc, 0, None, None, None, None
+        bar_count = len(df)
+        if not bar_count:
+            return None, 0, None, None, None, None
+        latest_stock_date = df["trade_date"].iat[-1]
+        if latest_stock_date < signal_date or bar_count < _MIN_BARS_FORCE:
+            return None, bar_count, latest_stock_date, None, None, None
+        quick = _quick_scalars(df["close"].to_numpy(dtype=np.float64))
+        if not _quick_prefilter(quick, mode):
+            return None, bar_count, latest_stock_date, quick, None, df
+        return None, bar_count, latest_stock_date, quick, _latest_indicator_row(df), None
+
+    def _scan_cached_symbol(self, symbol: str, signal_date: date) -> tuple:
+        # Same tuple as _scan_symbol, sliced out of the window-wide feature columns.
+        try:
+            dates, closes, columns = self._symbol_features(symbol)
+        except Exception as exc:
+            return exc, 0, None, None, None, None
+        lo = int(np.searchsorted(dates, np.datetime64(signal_date - timedelta(days=_BAR_LOOKBACK_DAYS), "D")))
+        hi = int(np.searchsorted(dates, np.datetime64(signal_date, "D"), side="right"))
+        bar_count = hi - lo
+        if not bar_count:
+            return None, 0, None, None, None, None
+        latest_stock_date = columns["trade_date"][hi - 1]
+        if latest_stock_date < signal_date or bar_count < _MIN_BARS_FORCE:
+            return None, bar_count, latest_stock_date, None, None, None
+        latest = {name: values[hi - 1] for name, values in columns.items()}
+        # The per-day frame starts at the lookback, so after a long suspension its longer windows are
+        # still NaN; the window-wide columns would fill them from bars before that.
+        for name, need in INDICATOR_WARMUP_BARS.items():
+            if bar_count < need:
+                latest[name] = np.nan
+        return None, bar_count, latest_stock_date, _quick_scalars(closes[lo:hi]), latest, None
+
+    def _symbol_features(self, symbol: str) -> tuple[np.ndarray, np.ndarray, dict[str, list]]:
+        # (datetime64 dates, float closes, {column: per-date values}) over the whole feature window.
+        cached = self._feature_cache.get(symbol)
+        if cached is None:
+            start, end = self._feature_window
+            df = add_indicators(self._bars_frame(symbol, start - timedelta(days=_BAR_LOOKBACK_DAYS), end))
+            columns = {name: df[name].tolist() for name in df.columns}
+            dates = np.array(columns["trade_date"], dtype="datetime64[D]")
+            # Failed fetches raise before this point and are retried on the next signal date.
+            cached = self._feature_cache[symbol] = (dates, df["close"].to_numpy(dtype=np.float64), columns)
+        return cached
+
+    def _fetch_recent_df(self, symbol: str, signal_date: date) -> pd.DataFrame:
+        return self._bars_frame(symbol, signal_date - timedelta(days=_BAR_LOOKBACK_DAYS), signal_date)
+
+    def _bars_frame(self, symbol: str, start: date, end: date) -> pd.DataFrame:
+        # Bars up to end as a bars_to_df frame; sources with get_bars_df skip the DailyBar objects.
+        get_bars_df = getattr(self.data_source, "get_bars_df", None)
+        if get_bars_df is None:
+            bars = self.data_source.get_daily_bars(symbol, start, end)
+            return bars_to_df([b for b in bars if b.trade_date <= end])
+        df = get_bars_df(symbol, start, end)
+        if len(df) and df["trade_date"].iat[-1] > end:
+            df = df[df["trade_date"] <= end].reset_index(drop=True)
+        return df
 
     def _build_metrics(self, latest, market_state: MarketState) -> dict[str, float]:
         close = float(latest["close"])
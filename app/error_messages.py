@@ -1,83 +1,122 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+from typing import Callable
 
+_RE_NO_BARS = re.compile(r"No bars found for\s+([0-9A-Za-z]+)")
+_RE_FOR_SYMBOL = re.compile(r"for\s+([0-9A-Za-z]+)")
+_RE_STALE = re.compile(
+    r"symbol=([0-9A-Za-z]+),\s*signal_date=([0-9]{4}-[0-9]{2}-[0-9]{2}),\s*latest=([0-9]{4}-[0-9]{2}-[0-9]{2})"
+)
 
-def friendly_error_message(exc_or_msg: Exception | str) -> str:
-    msg = str(exc_or_msg)
-
-    if "does not match format" in msg:
-        return "日期格式错误，请使用 YYYY-MM-DD，例如 2026-02-26。"
-    if "Not enough trade dates for backtest" in msg:
-        return "回测区间内交易日不足，至少需要 8 个交易日。请扩大 --start/--end 区间后重试。"
-    if "No enough trade dates to resolve T-1 signal date" in msg:
-        return "目标日期附近交易日不足，无法确定信号日(T-1)。请扩大日期范围后重试。"
-    if "does not pass" in msg and "threshold" in msg:
+
+def _from_match(pattern: re.Pattern[str], found: str, missing: str) -> Callable[[str], str]:
+    def reply(msg: str) -> str:
+        m = pattern.search(msg)
+        return found.format(*m.groups()) if m else missing
+
+    return reply
+
+
+def _threshold_reply(msg: str) -> str | None:
+    if "threshold" in msg:
         return "该股票未通过当前模式的选股阈值筛选。可尝试使用 --mode relaxed 或 --mode force。"
-    if "does not pass risk filter" in msg:
-        return "该股票未通过风险过滤规则，请更换标的或使用更宽松模式重试。"
-    if "No bars found for" in msg:
-        m = re.search(r"No bars found for\s+([0-9A-Za-z]+)", msg)
-        if m:
-            return f"未查询到股票 {m.group(1)} 在目标日期附近的K线数据。"
-        return "未查询到该股票在目标日期附近的K线数据，请检查股票代码和日期。"
-    if "No candidate found in enabled modes:" in msg:
-        return "当前启用模式下无候选，已按配置停止返回结果。建议检查数据源连通性和过滤条件。"
-    if "Failed to fetch stock universe from both name and spot sources" in msg:
-        return "获取股票列表失败（名称接口和实时行情接口都不可用）。请稍后重试或先运行 doctor。"
-    if "Failed to fetch daily bars from both EM/TX for" in msg:
-        m = re.search(r"for\s+([0-9A-Za-z]+)", msg)
-        if m:
-            return f"获取股票 {m.group(1)} 日线失败（EM/TX 两个来源都不可用）。"
-        return "获取股票日线失败（EM/TX 两个来源都不可用）。"
-    if "Failed to fetch daily bars(EM) for" in msg:
-        m = re.search(r"for\s+([0-9A-Za-z]+)", msg)
-        if m:
-            return f"获取股票 {m.group(1)} 日线失败（EM 数据源不可用）。"
-        return "获取股票日线失败（EM 数据源不可用）。"
-    if "Failed to fetch daily bars(TX) for" in msg:
-        m = re.search(r"for\s+([0-9A-Za-z]+)", msg)
-        if m:
-            return f"获取股票 {m.group(1)} 日线失败（TX 数据源不可用）。"
-        return "获取股票日线失败（TX 数据源不可用）。"
-    if "Market index stale:" in msg:
-        m = re.search(r"symbol=([0-9A-Za-z]+),\s*signal_date=([0-9]{4}-[0-9]{2}-[0-9]{2}),\s*latest=([0-9]{4}-[0-9]{2}-[0-9]{2})", msg)
-        if m:
-            return (
-                f"市场指数未更新到信号日，已停止执行推荐：指数 {m.group(1)} "
-                f"信号日 {m.group(2)}，最新仅到 {m.group(3)}。"
-            )
-        return "市场指数未更新到信号日，已停止执行推荐。"
-    if "Stock data stale:" in msg:
-        m = re.search(r"symbol=([0-9A-Za-z]+),\s*signal_date=([0-9]{4}-[0-9]{2}-[0-9]{2}),\s*latest=([0-9]{4}-[0-9]{2}-[0-9]{2})", msg)
-        if m:
-            return (
-                f"个股数据未更新到信号日，已停止执行推荐：股票 {m.group(1)} "
-                f"信号日 {m.group(2)}，最新仅到 {m.group(3)}。"
-            )
-        return "个股数据未更新到信号日，已停止执行推荐。"
-    if "Market index data unavailable:" in msg:
-        return "市场指数数据不可用（market_filter.fail_on_error=true），已停止执行推荐。请检查网络、DNS 或指数缓存。"
-    if "Unsupported command:" in msg:
-        return "命令不受支持，请检查子命令名称（recommend/explain/backtest/doctor/check-kline）。"
-    if "Config not found:" in msg:
-        return "配置文件不存在，请检查 --config 路径。"
-    if "Config root must be an object" in msg:
-        return "配置文件格式错误：根节点必须是对象（YAML 映射）。"
-    if "Unsupported mode:" in msg:
-        return "模式参数不支持，请使用 normal、relaxed 或 force。"
-    if "akshare is required but unavailable" in msg:
-        return "缺少 akshare 依赖或导入失败，请先安装项目依赖。"
+    return None
+
+
+# Checked in order; the first needle found in the message wins. A callable reply may return None to fall through.
+_RULES: tuple[tuple[str, str | Callable[[str], str | None]], ...] = (
+    ("does not match format", "日期格式错误，请使用 YYYY-MM-DD，例如 2026-02-26。"),
+    ("Not enough trade dates for backtest", "回测区间内交易日不足，至少需要 8 个交易日。请扩大 --start/--end 区间后重试。"),
+    ("No enough trade dates to resolve T-1 signal date", "目标日期附近交易日不足，无法确定信号日(T-1)。请扩大日期范围后重试。"),
+    ("does not pass", _threshold_reply),
+    ("does not pass risk filter", "该股票未通过风险过滤规则，请更换标的或使用更宽松模式重试。"),
+    (
+        "No bars found for",
+        _from_match(
+            _RE_NO_BARS,
+            "未查询到股票 {0} 在目标日期附近的K线数据。",
+            "未查询到该股票在目标日期附近的K线数据，请检查股票代码和日期。",
+        ),
+    ),
+    ("No candidate found in enabled modes:", "当前启用模式下无候选，已按配置停止返回结果。建议检查数据源连通性和过滤条件。"),
+    (
+        "Failed to fetch stock universe from both name and spot sources",
+        "获取股票列表失败（名称接口和实时行情接口都不可用）。请稍后重试或先运行 doctor。",
+    ),
+    (
+        "Failed to fetch daily bars from both EM/TX for",
+        _from_match(
+            _RE_FOR_SYMBOL,
+            "获取股票 {0} 日线失败（EM/TX 两个来源都不可用）。",
+            "获取股票日线失败（EM/TX 两个来源都不可用）。",
+        ),
+    ),
+    (
+        "Failed to fetch daily bars(EM) for",
+        _from_match(_RE_FOR_SYMBOL, "获取股票 {0} 日线失败（EM 数据源不可用）。", "获取股票日线失败（EM 数据源不可用）。"),
+    ),
+    (
+        "Failed to fetch daily bars(TX) for",
+        _from_match(_RE_FOR_SYMBOL, "获取股票 {0} 日线失败（TX 数据源不可用）。", "获取股票日线失败（TX 数据源不可用）。"),
+    ),
+    (
+        "Market index stale:",
+        _from_match(
+            _RE_STALE,
+            "市场指数未更新到信号日，已停止执行推荐：指数 {0} 信号日 {1}，最新仅到 {2}。",
+            "市场指数未更新到信号日，已停止执行推荐。",
+        ),
+    ),
+    (
+        "Stock data stale:",
+        _from_match(
+            _RE_STALE,
+            "个股数据未更新到信号日，已停止执行推荐：股票 {0} 信号日 {1}，最新仅到 {2}。",
+            "个股数据未更新到信号日，已停止执行推荐。",
+        ),
+    ),
+    (
+        "Market index data unavailable:",
+        "市场指数数据不可用（market_filter.fail_on_error=true），已停止执行推荐。请检查网络、DNS 或指数缓存。",
+    ),
+    ("Unsupported command:", "命令不受支持，请检查子命令名称（recommend/explain/backtest/doctor/check-kline）。"),
+    ("Config not found:", "配置文件不存在，请检查 --config 路径。"),
+    ("Config root must be an object", "配置文件格式错误：根节点必须是对象（YAML 映射）。"),
+    ("Unsupported mode:", "模式参数不支持，请使用 normal、relaxed 或 force。"),
+    ("akshare is required but unavailable", "缺少 akshare 依赖或导入失败，请先安装项目依赖。"),
+)
+
+# Matched against the lower-cased message after _RULES; any needle in a group selects its reply.
+_LOWER_RULES: tuple[tuple[tuple[str, ...], str], ...] = (
+    (("name or service not known", "nodename nor servname provided"), "域名解析失败，请检查网络/DNS。"),
+    (("connection refused",), "连接被拒绝，请检查目标服务是否可访问。"),
+    (("read timed out", "connect timeout", "timed out"), "请求超时，请稍后重试或检查网络。"),
+    (("max retries exceeded",), "请求重试次数已用尽，网络或目标站点可能不可用。"),
+)
+
+
+def friendly_error_message(exc_or_msg: Exception | str) -> str:
+    return _translate(str(exc_or_msg))
+
+
+# Translation only depends on the message text; the same failures repeat across symbols and backtest days.
+@lru_cache(maxsize=1024)
+def _translate(msg: str) -> str:
+    for needle, reply in _RULES:
+        if needle not in msg:
+            continue
+        if isinstance(reply, str):
+            return reply
+        text = reply(msg)
+        if text is not None:
+            return text
 
     lower = msg.lower()
-    if "name or service not known" in lower or "nodename nor servname provided" in lower:
-        return "域名解析失败，请检查网络/DNS。"
-    if "connection refused" in lower:
-        return "连接被拒绝，请检查目标服务是否可访问。"
-    if "read timed out" in lower or "connect timeout" in lower or "timed out" in lower:
-        return "请求超时，请稍后重试或检查网络。"
-    if "max retries exceeded" in lower:
-        return "请求重试次数已用尽，网络或目标站点可能不可用。"
+    for needles, reply in _LOWER_RULES:
+        if any(n in lower for n in needles):
+            return reply
     if "ssl" in lower and "error" in lower:
         return "SSL 连接失败，请检查本机证书或网络中间代理。"
 
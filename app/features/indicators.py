@@ -1,60 +1,183 @@
 from __future__ import annotations
 
+from operator import attrgetter
+
 import numpy as np
 import pandas as pd
 
 from app.models import DailyBar
 
 
+_BAR_FIELDS = ["trade_date", "open", "high", "low", "close", "volume", "turnover_rate"]
+_BAR_FLOAT_FIELDS = ("open", "high", "low", "close", "volume")
+
+
 def bars_to_df(bars: list[DailyBar]) -> pd.DataFrame:
-    df = pd.DataFrame(
-        {
-            "trade_date": [b.trade_date for b in bars],
-            "open": [b.open for b in bars],
-            "high": [b.high for b in bars],
-            "low": [b.low for b in bars],
-            "close": [b.close for b in bars],
-            "volume": [b.volume for b in bars],
-            "turnover_rate": [b.turnover_rate for b in bars],
-        }
-    )
-    if df.empty:
-        return df
-    df = df.sort_values("trade_date").reset_index(drop=True)
+    if not bars:
+        return pd.DataFrame(columns=_BAR_FIELDS)
+    # Column-wise: one float64 array per numeric field, then a single DataFrame build.
+    n = len(bars)
+    columns: dict[str, object] = {"trade_date": [b.trade_date for b in bars]}
+    for name in _BAR_FLOAT_FIELDS:
+        columns[name] = np.fromiter(map(attrgetter(name), bars), dtype=np.float64, count=n)
+    # Left to pandas so missing (None) turnover keeps its previous NaN / all-None handling.
+    columns["turnover_rate"] = [b.turnover_rate for b in bars]
+    df = pd.DataFrame(columns)
+    # Data sources return chronological bars; only sort when they do not.
+    if not df["trade_date"].is_monotonic_increasing:
+        df = df.sort_values("trade_date").reset_index(drop=True)
     return df
 
 
-def rsi(series: pd.Series, window: int = 14) -> pd.Series:
-    diff = series.diff()
+def _window_sums(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    # Running-sum pass: sums of each full window (NaN counted as 0) and a mask of windows holding a NaN.
+    nan = np.isnan(values)
+    csum = np.empty(values.shape[0] + 1)
+    csum[0] = 0.0
+    np.cumsum(np.where(nan, 0.0, values), out=csum[1:])
+    sums = csum[window:] - csum[:-window]
+    if not nan.any():
+        return sums, np.zeros(sums.shape[0], dtype=bool)
+    ncount = np.concatenate(([0], np.cumsum(nan)))
+    return sums, (ncount[window:] - ncount[:-window]) > 0
+
+
+def _constant_windows(values: np.ndarray, window: int) -> np.ndarray:
+    # Windows whose values are all equal; running sums drift there by a few ulps, so callers
+    # pin them to the exact value (as pandas does) instead of e.g. a 1e-9 std of a flat series.
+    idx = np.arange(values.shape[0])
+    breaks = np.ones(values.shape[0], dtype=bool)
+    np.not_equal(values[1:], values[:-1], out=breaks[1:])
+    run_start = np.maximum.accumulate(np.where(breaks, idx, 0))
+    return (idx - run_start + 1)[window - 1 :] >= window
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    # Same result as Series.rolling(window).mean(): NaN until a full window, NaN if the window holds a NaN.
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] >= window:
+        sums, has_nan = _window_sums(values, window)
+        tail = out[window - 1 :]
+        np.divide(sums, window, out=tail)
+        flat = _constant_windows(values, window)
+        tail[flat] = values[window - 1 :][flat]
+        tail[has_nan] = np.nan
+    return out
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    # Sample std (ddof=1) from running sums of x and x**2. Centering on the overall mean first
+    # keeps the sum-of-squares difference from cancelling on large values such as volume.
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] >= window:
+        finite = values[~np.isnan(values)]
+        centered = values - (finite.mean() if finite.size else 0.0)
+        sums, has_nan = _window_sums(centered, window)
+        sq_sums, _ = _window_sums(centered * centered, window)
+        var = (sq_sums - sums * sums / window) / (window - 1)
+        tail = out[window - 1 :]
+        np.sqrt(np.maximum(var, 0.0), out=tail)
+        tail[_constant_windows(values, window)] = 0.0
+        tail[has_nan] = np.nan
+    return out
+
+
+def _rsi_values(close: np.ndarray, window: int) -> np.ndarray:
+    diff = np.empty_like(close)
+    diff[0] = np.nan
+    np.subtract(close[1:], close[:-1], out=diff[1:])
     gain = np.where(diff > 0, diff, 0.0)
     loss = np.where(diff < 0, -diff, 0.0)
-    gain_avg = pd.Series(gain, index=series.index).rolling(window=window, min_periods=window).mean()
-    loss_avg = pd.Series(loss, index=series.index).rolling(window=window, min_periods=window).mean()
-    rs = gain_avg / loss_avg.replace(0, np.nan)
+    gain_avg = _rolling_mean(gain, window)
+    loss_avg = _rolling_mean(loss, window)
+    # A zero average loss leaves RSI undefined (NaN), as before.
+    rs = np.divide(gain_avg, loss_avg, out=np.full_like(gain_avg, np.nan), where=loss_avg != 0)
     return 100 - (100 / (1 + rs))
 
 
+def rsi(series: pd.Series, window: int = 14) -> pd.Series:
+    if series.empty:
+        return pd.Series(np.nan, index=series.index, dtype=np.float64)
+    return pd.Series(_rsi_values(series.to_numpy(dtype=np.float64), window), index=series.index)
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] > periods:
+        out[periods:] = values[:-periods]
+    return out
+
+
+def _pct_change(values: np.ndarray, periods: int) -> np.ndarray:
+    # values / values shifted by periods - 1, without materialising the shifted copy.
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] > periods:
+        np.divide(values[periods:], values[:-periods], out=out[periods:])
+        out[periods:] -= 1.0
+    return out
+
+
+# Bars a frame needs before each indicator's latest row stops being NaN.
+INDICATOR_WARMUP_BARS = {
+    "ret_1d": 2,
+    "ma20": 20,
+    "ma60": 60,
+    "mom5": 6,
+    "mom20": 21,
+    "rsi14": 14,
+    "vol20_std": 21,
+    "ma20_slope5": 25,
+    "vol_ma5": 5,
+    "vol_ma20": 20,
+    "vol_ratio_5_20": 20,
+    "volume_std20": 20,
+    "volume_zscore20": 20,
+    "tr": 1,
+    "atr14": 14,
+}
+
+
+def _indicator_columns(
+    close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray
+) -> dict[str, np.ndarray]:
+    # All indicators straight from the raw float arrays; no intermediate Series per step.
+    prev_close = _shift(close, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret_1d = _pct_change(close, 1)
+        ma20 = _rolling_mean(close, 20)
+        vol_ma5 = _rolling_mean(volume, 5)
+        vol_ma20 = _rolling_mean(volume, 20)
+        volume_std20 = _rolling_std(volume, 20)
+        # fmax skips NaN like DataFrame.max(axis=1) does for the first row's missing prev_close.
+        tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+        return {
+            "ret_1d": ret_1d,
+            "ma20": ma20,
+            "ma60": _rolling_mean(close, 60),
+            "mom5": _pct_change(close, 5),
+            "mom20": _pct_change(close, 20),
+            "rsi14": _rsi_values(close, 14),
+            "vol20_std": _rolling_std(ret_1d, 20),
+            "ma20_slope5": _pct_change(ma20, 5),
+            "vol_ma5": vol_ma5,
+            "vol_ma20": vol_ma20,
+            "vol_ratio_5_20": vol_ma5 / vol_ma20,
+            "volume_std20": volume_std20,
+            "volume_zscore20": (volume - vol_ma20) / volume_std20,
+            "tr": tr,
+            "atr14": _rolling_mean(tr, 14),
+        }
+
+
 def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    # Returns df with the indicator columns appended. A single concat builds one block for all of them,
+    # which is several times cheaper than fifteen separate column assignments.
     if df.empty:
         return df
-    out = df.copy()
-    out["ret_1d"] = out["close"].pct_change()
-    out["ma20"] = out["close"].rolling(20).mean()
-    out["ma60"] = out["close"].rolling(60).mean()
-    out["mom5"] = out["close"] / out["close"].shift(5) - 1.0
-    out["mom20"] = out["close"] / out["close"].shift(20) - 1.0
-    out["rsi14"] = rsi(out["close"], 14)
-    out["vol20_std"] = out["ret_1d"].rolling(20).std()
-    out["ma20_slope5"] = out["ma20"] / out["ma20"].shift(5) - 1.0
-    out["vol_ma5"] = out["volume"].rolling(5).mean()
-    out["vol_ma20"] = out["volume"].rolling(20).mean()
-    out["vol_ratio_5_20"] = out["vol_ma5"] / out["vol_ma20"]
-    out["volume_std20"] = out["volume"].rolling(20).std()
-    out["volume_zscore20"] = (out["volume"] - out["vol_ma20"]) / out["volume_std20"]
-    prev_close = out["close"].shift(1)
-    tr1 = out["high"] - out["low"]
-    tr2 = (out["high"] - prev_close).abs()
-    tr3 = (out["low"] - prev_close).abs()
-    out["tr"] = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    out["atr14"] = out["tr"].rolling(14).mean()
-    return out
+    columns = _indicator_columns(
+        df["close"].to_numpy(dtype=np.float64),
+        df["high"].to_numpy(dtype=np.float64),
+        df["low"].to_numpy(dtype=np.float64),
+        df["volume"].to_numpy(dtype=np.float64),
+    )
+    return pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1)
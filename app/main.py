@@ -4,22 +4,30 @@ import argparse
 import contextlib
 import io
 import json
+import math
 import sys
 from datetime import date, datetime
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON output when installed
+    orjson = None
+
 from app.backtest.runner import BacktestRunner
 from app.config import load_config
 from app.data_source.akshare_client import AkshareDataSource
 from app.doctor import print_doctor_report, run_doctor
 from app.engine.recommender import Recommender
 from app.error_messages import friendly_error_message
-from app.network import clear_proxy_env, disable_requests_env_proxy, force_no_proxy_all
-from app.reporting import (
-    append_recommendation_csv,
-    append_recommendation_md,
-    append_recommendation_txt,
-    resolve_recommendation_output_log_path,
+from app.network import (
+    clear_proxy_env,
+    disable_requests_env_proxy,
+    force_no_proxy_all,
+    route_requests_through_shared_session,
 )
+from app.reporting import resolve_recommendation_output_log_path, write_reports
 
 
 METRIC_LABELS_ZH = {
@@ -60,25 +68,52 @@ def _parse_date(v: str | None) -> date:
     return datetime.strptime(v, "%Y-%m-%d").date()
 
 
+def _json_ready(obj):
+    # For the json fallback: what orjson handles natively (NaN/inf -> null, numpy -> Python, non-str keys).
+    if isinstance(obj, dict):
+        return {k if isinstance(k, str) else str(k): _json_ready(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_ready(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return [_json_ready(v) for v in obj.tolist()]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float):
+        return float(obj) if math.isfinite(obj) else None
+    if obj is None or isinstance(obj, (str, int)):
+        return obj
+    return str(obj)
+
+
+def _dumps(obj) -> str:
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        return orjson.dumps(obj, option=option, default=str).decode("utf-8")
+    return json.dumps(_json_ready(obj), ensure_ascii=False, indent=2, allow_nan=False)
+
+
+def _write_lines(lines: list[str]) -> None:
+    # One write per table instead of one print() per line.
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
 def _print_recommendations(recs, output: str) -> None:
     if not recs:
         raise RuntimeError("No recommendations")
     rec = recs[0]
     if output == "json":
         payload = [item.as_dict() for item in recs]
-        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        print(_dumps(payload))
         return
-    print(f"交易日: {rec.trade_date.isoformat()}  阈值模式: {rec.threshold_mode}  推荐数量: {len(recs)}")
+    out = [f"交易日: {rec.trade_date.isoformat()}  阈值模式: {rec.threshold_mode}  推荐数量: {len(recs)}"]
     for idx, item in enumerate(recs, start=1):
-        print(f"\n[{idx}] {item.symbol} {item.name}")
-        print(f"总分: {item.score_total:.2f}")
-        print("关键指标:")
-        for k, v in item.key_metrics.items():
-            label = METRIC_LABELS_ZH.get(k, k)
-            print(f"  - {label}: {v:.4f}")
-        print("推荐理由:")
-        for ridx, r in enumerate(item.reason, start=1):
-            print(f"  {ridx}. {r}")
+        out.append(f"\n[{idx}] {item.symbol} {item.name}")
+        out.append(f"总分: {item.score_total:.2f}")
+        out.append("关键指标:")
+        out.extend(f"  - {METRIC_LABELS_ZH.get(k, k)}: {v:.4f}" for k, v in item.key_metrics.items())
+        out.append("推荐理由:")
+        out.extend(f"  {ridx}. {r}" for ridx, r in enumerate(item.reason, start=1))
+    _write_lines(out)
 
 
 def _print_backtest(summary: dict, output: str) -> None:
@@ -122,7 +157,7 @@ def _print_backtest(summary: dict, output: str) -> None:
             if k in percent_keys and isinstance(v, (int, float)):
                 val = f"{v:.2%}"
             payload[k] = val
-        print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+        print(_dumps(payload))
         return
     if output == "json-cn":
         key_map = {
@@ -180,34 +215,36 @@ def _print_backtest(summary: dict, output: str) -> None:
                 if k in percent_keys and isinstance(v, (int, float)):
                     val = f"{v:.2%}"
                 payload[out_key] = val
-        print(json.dumps(payload, ensure_ascii=False, indent=2, default=str))
+        print(_dumps(payload))
         return
-    print(f"回测区间: {summary['period']}")
-    print(f"尝试交易日: {summary.get('attempted_days', 0)}")
-    print(f"跳过交易日: {summary.get('skipped_days', 0)}")
-    print(f"交易次数: {summary['total_trades']}")
-    print(f"1日胜率(毛): {summary['win_rate_gross_1d']:.2%}")
-    print(f"3日胜率(毛): {summary.get('win_rate_gross_3d', 0.0):.2%}")
-    print(f"1日胜率(净): {summary['win_rate_net_1d']:.2%}")
-    print(f"3日胜率(净): {summary.get('win_rate_net_3d', 0.0):.2%}")
-    print(f"平均1日收益(毛): {summary['avg_return_1d_gross']:.4%}")
-    print(f"平均3日收益(毛): {summary.get('avg_return_3d_gross', 0.0):.4%}")
-    print(f"平均1日收益(净): {summary['avg_return_1d_net']:.4%}")
-    print(f"平均3日收益(净): {summary.get('avg_return_3d_net', 0.0):.4%}")
-    print(f"平均5日收益(毛): {summary['avg_return_5d_gross']:.4%}")
-    print(f"平均5日收益(净): {summary['avg_return_5d_net']:.4%}")
-    print(f"最大回撤代理: {summary['max_drawdown_proxy']:.2%}")
+    out = [
+        f"回测区间: {summary['period']}",
+        f"尝试交易日: {summary.get('attempted_days', 0)}",
+        f"跳过交易日: {summary.get('skipped_days', 0)}",
+        f"交易次数: {summary['total_trades']}",
+        f"1日胜率(毛): {summary['win_rate_gross_1d']:.2%}",
+        f"3日胜率(毛): {summary.get('win_rate_gross_3d', 0.0):.2%}",
+        f"1日胜率(净): {summary['win_rate_net_1d']:.2%}",
+        f"3日胜率(净): {summary.get('win_rate_net_3d', 0.0):.2%}",
+        f"平均1日收益(毛): {summary['avg_return_1d_gross']:.4%}",
+        f"平均3日收益(毛): {summary.get('avg_return_3d_gross', 0.0):.4%}",
+        f"平均1日收益(净): {summary['avg_return_1d_net']:.4%}",
+        f"平均3日收益(净): {summary.get('avg_return_3d_net', 0.0):.4%}",
+        f"平均5日收益(毛): {summary['avg_return_5d_gross']:.4%}",
+        f"平均5日收益(净): {summary['avg_return_5d_net']:.4%}",
+        f"最大回撤代理: {summary['max_drawdown_proxy']:.2%}",
+    ]
     mode_counts = summary.get("threshold_mode_counts", {})
     if mode_counts:
-        print(f"模式分布: {mode_counts}")
+        out.append(f"模式分布: {mode_counts}")
     error_counts = summary.get("error_counts", {})
     if error_counts:
-        print(f"错误统计: {error_counts}")
+        out.append(f"错误统计: {error_counts}")
     examples = summary.get("error_examples", [])
     if examples:
-        print("错误示例:")
-        for e in examples[:5]:
-            print(f"  - {e['trade_date']} {e['error_type']}: {e['message']}")
+        out.append("错误示例:")
+        out.extend(f"  - {e['trade_date']} {e['error_type']}: {e['message']}" for e in examples[:5])
+    _write_lines(out)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -252,6 +289,12 @@ def main() -> None:
     if cfg.get("network", {}).get("force_no_proxy_all", True):
         force_no_proxy_all()
         disable_requests_env_proxy()
+    net_cfg = cfg.get("network", {})
+    if bool(net_cfg.get("shared_session", False)):
+        route_requests_through_shared_session(
+            pool_connections=int(net_cfg.get("pool_connections", 32)),
+            pool_maxsize=int(net_cfg.get("pool_maxsize", 32)),
+        )
     ds_cfg = cfg.get("data_source", {})
     ds = AkshareDataSource(
         request_timeout_sec=float(ds_cfg.get("request_timeout_sec", 6.0)),
@@ -277,15 +320,14 @@ def main() -> None:
                 with contextlib.redirect_stdout(tee_stdout):
                     recs = rec_engine.recommend_many(target_date, count=args.count)
                     _print_recommendations(recs, args.output)
+                    run_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                     for rec in recs:
-                        saved = append_recommendation_csv(
-                            rec, str(report_cfg.get("recommendation_csv", "reports/recommendations.csv"))
-                        )
-                        saved_md = append_recommendation_md(
-                            rec, str(report_cfg.get("recommendation_md", "reports/recommendations.md"))
-                        )
-                        saved_txt = append_recommendation_txt(
-                            rec, str(report_cfg.get("recommendation_txt", "reports/recommendations.txt"))
+                        saved, saved_md, saved_txt = write_reports(
+                            rec,
+                            str(report_cfg.get("recommendation_csv", "reports/recommendations.csv")),
+                            str(report_cfg.get("recommendation_md", "reports/recommendations.md")),
+                            str(report_cfg.get("recommendation_txt", "reports/recommendations.txt")),
+                            run_time=run_time,
                         )
                     print(f"已写入文档: {saved}")
                     print(f"已写入文档: {saved_md}")
@@ -309,19 +351,15 @@ def main() -> None:
             "reason": cand.reason,
         }
         if args.output == "json":
-            print(json.dumps(payload, ensure_ascii=False, indent=2))
+            print(_dumps(payload))
             return
-        print(f"交易日: {target.isoformat()}  股票: {cand.symbol} {cand.name}")
-        print(f"总分: {cand.score_total:.2f}")
-        print("分项:")
-        for k, v in cand.score_breakdown.items():
-            print(f"  - {k}: {v:.2f}")
-        print("关键指标:")
-        for k, v in cand.key_metrics.items():
-            print(f"  - {k}: {v:.4f}")
-        print("理由:")
-        for idx, r in enumerate(cand.reason, start=1):
-            print(f"  {idx}. {r}")
+        out = [f"交易日: {target.isoformat()}  股票: {cand.symbol} {cand.name}", f"总分: {cand.score_total:.2f}", "分项:"]
+        out.extend(f"  - {k}: {v:.2f}" for k, v in cand.score_breakdown.items())
+        out.append("关键指标:")
+        out.extend(f"  - {k}: {v:.4f}" for k, v in cand.key_metrics.items())
+        out.append("理由:")
+        out.extend(f"  {idx}. {r}" for idx, r in enumerate(cand.reason, start=1))
+        _write_lines(out)
         return
 
     if args.cmd == "backtest":
@@ -336,9 +374,9 @@ def main() -> None:
         return
 
     if args.cmd == "doctor":
-        report = run_doctor()
+        report = run_doctor(cfg)
         if args.output == "json":
-            print(json.dumps(report, ensure_ascii=False, indent=2))
+            print(_dumps(report))
             return
         print_doctor_report(report)
         return
@@ -356,7 +394,7 @@ def main() -> None:
             "last_date": bars[-1].trade_date.isoformat() if bars else None,
         }
         if args.output == "json":
-            print(json.dumps(payload, ensure_ascii=False, indent=2))
+            print(_dumps(payload))
             return
         print(f"symbol: {payload['symbol']}")
         print(f"range: {payload['start']} -> {payload['end']}")
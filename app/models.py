@@ -5,7 +5,7 @@ from datetime import date
 from typing import Any
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StockInfo:
     symbol: str
     name: str
@@ -15,7 +15,7 @@ class StockInfo:
     market: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DailyBar:
     trade_date: date
     open: float
@@ -26,7 +26,7 @@ class DailyBar:
     turnover_rate: float | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CandidateScore:
     symbol: str
     name: str
@@ -36,7 +36,7 @@ class CandidateScore:
     reason: list[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RecommendationResult:
     trade_date: date
     symbol: str
@@ -60,7 +60,7 @@ class RecommendationResult:
         }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BacktestRecord:
     trade_date: date
     symbol: str
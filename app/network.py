@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import os
+import threading
 from typing import Callable, Dict
 
 import requests
-from typing import Dict
+from requests.adapters import HTTPAdapter
 
 
-PROXY_ENV_KEYS = [
+# Immutable and ordered, so get_proxy_env() reports keys in a stable order.
+PROXY_ENV_KEYS = (
     "http_proxy",
     "https_proxy",
     "all_proxy",
@@ -16,23 +18,19 @@ PROXY_ENV_KEYS = [
     "ALL_PROXY",
     "no_proxy",
     "NO_PROXY",
-]
+)
 
 
 def get_proxy_env() -> Dict[str, str]:
-    out: Dict[str, str] = {}
-    for key in PROXY_ENV_KEYS:
-        val = os.environ.get(key)
-        if val:
-            out[key] = val
-    return out
+    environ = os.environ
+    return {key: environ[key] for key in PROXY_ENV_KEYS if environ.get(key)}
 
 
-def clear_proxy_env() -> Dict[str, str]:
-    existing = get_proxy_env()
+def clear_proxy_env() -> None:
+    # Callers that want the previous values take a get_proxy_env() snapshot first.
+    pop = os.environ.pop
     for key in PROXY_ENV_KEYS:
-        os.environ.pop(key, None)
-    return existing
+        pop(key, None)
 
 
 def force_no_proxy_all() -> None:
@@ -60,3 +58,54 @@ def disable_requests_env_proxy() -> None:
 
     requests.sessions.Session.__init__ = _patched_init
     _REQUESTS_PATCHED = True
+
+
+_THREAD_SESSIONS = threading.local()
+_ORIG_API_REQUEST: Callable | None = None
+
+
+def build_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_thread_session(pool_connections: int = 32, pool_maxsize: int = 32) -> requests.Session:
+    """
+    Keep-alive session owned by the calling thread. requests.Session is not documented as thread-safe,
+    so the fetch pools' worker threads each get their own. Built on first use, so it honours
+    disable_requests_env_proxy() when that was called earlier.
+    """
+    session = getattr(_THREAD_SESSIONS, "session", None)
+    if session is None:
+        session = _THREAD_SESSIONS.session = build_session(pool_connections, pool_maxsize)
+    return session
+
+
+def route_requests_through_shared_session(pool_connections: int = 32, pool_maxsize: int = 32) -> None:
+    """
+    Send module-level requests.get/post/... calls (which akshare uses) through the calling thread's
+    session, so repeated fetches reuse pooled connections instead of a new TCP/TLS handshake per call.
+    """
+    global _ORIG_API_REQUEST
+    if _ORIG_API_REQUEST is not None:
+        return
+    _ORIG_API_REQUEST = requests.api.request
+
+    def _shared_request(method, url, **kwargs):
+        return get_thread_session(pool_connections, pool_maxsize).request(method=method, url=url, **kwargs)
+
+    requests.api.request = _shared_request
+
+
+def unroute_requests() -> None:
+    """
+    Undo route_requests_through_shared_session(): module-level calls get a fresh session again.
+    """
+    global _ORIG_API_REQUEST
+    if _ORIG_API_REQUEST is None:
+        return
+    requests.api.request = _ORIG_API_REQUEST
+    _ORIG_API_REQUEST = None
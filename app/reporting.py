@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime, date
+from functools import lru_cache
 from pathlib import Path
+import os
 import unicodedata
 
 import pandas as pd
@@ -9,162 +11,156 @@ import pandas as pd
 from app.models import RecommendationResult
 
 
-def _build_row(rec: RecommendationResult) -> dict:
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+# key_metrics fields copied into the report row, with their rounding.
+_PRICE_FIELDS = (("close", 4), ("stop_loss_price", 4), ("take_profit_price", 4))
+
+
+def _build_row(rec: RecommendationResult, run_time: str | None = None) -> dict:
+    metrics = rec.key_metrics
     row = {
-        "run_time": now,
+        "run_time": run_time or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "trade_date": rec.trade_date.isoformat(),
         "symbol": rec.symbol,
         "name": rec.name,
         "threshold_mode": rec.threshold_mode,
         "score_total": round(rec.score_total, 2),
-        "close": round(float(rec.key_metrics.get("close", 0.0)), 4),
-        "stop_loss_price": round(float(rec.key_metrics.get("stop_loss_price", 0.0)), 4),
-        "take_profit_price": round(float(rec.key_metrics.get("take_profit_price", 0.0)), 4),
-        "suggested_holding_days": int(float(rec.key_metrics.get("suggested_holding_days", 0.0))),
     }
+    for key, ndigits in _PRICE_FIELDS:
+        row[key] = round(float(metrics.get(key, 0.0)), ndigits)
+    row["suggested_holding_days"] = int(float(metrics.get("suggested_holding_days", 0.0)))
     return row
 
 
-def append_recommendation_csv(rec: RecommendationResult, path: str) -> Path:
-    out_path = Path(path)
+def _row_frame(row: dict) -> pd.DataFrame:
+    # One-row frame straight from the values; skips the list-of-dicts key alignment of DataFrame([row]).
+    return pd.DataFrame.from_records([tuple(row.values())], columns=list(row))
+
+
+# Parsed recommendation history keyed by resolved CSV path; the stat key drops entries the file has moved past.
+_HISTORY_CACHE: dict[str, tuple[tuple[int, int], pd.DataFrame]] = {}
+
+
+def _history_stat(csv_path: Path) -> tuple[int, int]:
+    st = csv_path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_history(csv_path: Path) -> pd.DataFrame | None:
+    # Same as pd.read_csv(csv_path, dtype=str) but parsed at most once per file version; None if missing.
+    if not csv_path.exists():
+        return None
+    key = str(csv_path.resolve())
+    stat = _history_stat(csv_path)
+    cached = _HISTORY_CACHE.get(key)
+    if cached is None or cached[0] != stat:
+        cached = _HISTORY_CACHE[key] = (stat, pd.read_csv(csv_path, dtype=str))
+    return cached[1].copy()
+
+
+_REPORT_COLS = [
+    "run_time",
+    "trade_date",
+    "symbol",
+    "name",
+    "threshold_mode",
+    "score_total",
+    "close",
+    "stop_loss_price",
+    "take_profit_price",
+    "suggested_holding_days",
+]
+_HEADER_LABELS_CN = {
+    "run_time": "运行时间",
+    "trade_date": "交易日",
+    "symbol": "代码",
+    "name": "名称",
+    "threshold_mode": "模式",
+    "score_total": "总分",
+    "close": "收盘价",
+    "stop_loss_price": "止损价",
+    "take_profit_price": "止盈价",
+    "suggested_holding_days": "建议持股天数",
+}
+_FIELD_NOTES = (
+    "字段说明(中文): 运行时间 | 交易日 | 股票代码 | 股票名称 | 筛选模式 | 总分 | 收盘价 | 止损价 | 止盈价 | 建议持股天数\n"
+    "Field Mapping(English): run_time | trade_date | symbol | name | threshold_mode | score_total | close | stop_loss_price | take_profit_price | suggested_holding_days\n\n"
+)
+
+
+def _can_append(out_path: Path, columns: list[str]) -> bool:
+    # True when the file already has exactly this header and ends on a line break.
+    try:
+        with out_path.open("rb") as f:
+            header = f.readline()
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+    except OSError:
+        return False
+    return header.rstrip(b"\r\n") == ",".join(columns).encode("utf-8") and last == b"\n"
+
+
+def _append_history(rec: RecommendationResult, out_path: Path, run_time: str | None = None) -> pd.DataFrame | None:
+    # Appends rec to the CSV history. Returns the full history frame when it is known without
+    # parsing the file, else None.
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    row = _build_row(rec)
-    if out_path.exists():
+    row = _build_row(rec, run_time)
+    # Cached rows hold what read_csv(dtype=str) would return for the new row.
+    new_row = _row_frame({k: str(v) for k, v in row.items()})
+    key = str(out_path.resolve())
+    if _can_append(out_path, list(row)):
+        # Same schema: write just the new line instead of rewriting the whole history.
+        cached = _HISTORY_CACHE.pop(key, None)
+        fresh = cached is not None and cached[0] == _history_stat(out_path)
+        new_row.to_csv(out_path, mode="a", header=False, index=False)
+        if not fresh:
+            return None
+        df = pd.concat([cached[1], new_row], ignore_index=True)
+    else:
+        # New file, or an older column layout that has to be migrated: rewrite it in full.
         try:
-            old = pd.read_csv(out_path, dtype=str)
-            df = pd.concat([old, pd.DataFrame([row])], ignore_index=True)
+            old = _read_history(out_path)
         except Exception:
-            df = pd.DataFrame([row])
-    else:
-        df = pd.DataFrame([row])
-    df.to_csv(out_path, index=False)
-    return out_path
+            old = None
+        df = new_row if old is None else pd.concat([old, new_row], ignore_index=True)
+        df.to_csv(out_path, index=False)
+    _HISTORY_CACHE[key] = (_history_stat(out_path), df)
+    return df
 
 
-def append_recommendation_md(rec: RecommendationResult, path: str) -> Path:
-    out_path = Path(path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    row = _build_row(rec)
-    csv_path = out_path.with_suffix(".csv")
-    if csv_path.exists():
-        try:
-            df = pd.read_csv(csv_path, dtype=str)
-        except Exception:
-            df = pd.DataFrame([row])
-    else:
-        df = pd.DataFrame([row])
-
-    cols = [
-        "run_time",
-        "trade_date",
-        "symbol",
-        "name",
-        "threshold_mode",
-        "score_total",
-        "close",
-        "stop_loss_price",
-        "take_profit_price",
-        "suggested_holding_days",
-    ]
-    header_labels_cn = {
-        "run_time": "运行时间",
-        "trade_date": "交易日",
-        "symbol": "代码",
-        "name": "名称",
-        "threshold_mode": "模式",
-        "score_total": "总分",
-        "close": "收盘价",
-        "stop_loss_price": "止损价",
-        "take_profit_price": "止盈价",
-        "suggested_holding_days": "建议持股天数",
-    }
-    header_labels_en = {
-        "run_time": "run_time",
-        "trade_date": "trade_date",
-        "symbol": "symbol",
-        "name": "name",
-        "threshold_mode": "threshold_mode",
-        "score_total": "score_total",
-        "close": "close",
-        "stop_loss_price": "stop_loss_price",
-        "take_profit_price": "take_profit_price",
-        "suggested_holding_days": "suggested_holding_days",
-    }
-    for c in cols:
-        if c not in df.columns:
-            df[c] = ""
-    df = df[cols].fillna("")
-    if "symbol" in df.columns:
-        df["symbol"] = df["symbol"].map(lambda x: str(x).split(".")[0].zfill(6))
-
-    display_cols = [header_labels_cn[c] for c in cols]
+def _history_for(rec: RecommendationResult, csv_path: Path) -> pd.DataFrame:
+    try:
+        df = _read_history(csv_path)
+    except Exception:
+        df = None
+    return _row_frame(_build_row(rec)) if df is None else df
+
+
+def _report_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # reindex returns a new frame, so the cached history is never modified here.
+    df = df.reindex(columns=_REPORT_COLS, fill_value="").fillna("")
+    df["symbol"] = df["symbol"].map(lambda x: str(x).split(".")[0].zfill(6))
+    return df
+
+
+def _render_md(df: pd.DataFrame) -> str:
+    df = _report_frame(df)
+    display_cols = [_HEADER_LABELS_CN[c] for c in _REPORT_COLS]
     header = "| " + " | ".join(display_cols) + " |\n"
     sep = "|---|---|---|---|---|---:|---:|---:|---:|---:|\n"
     lines = []
-    for _, r in df.iterrows():
-        vals = [str(r[c]) for c in cols]
-        vals = [v.replace("|", "\\|") for v in vals]
+    for row in df.to_numpy(dtype=object):
+        vals = [str(x).replace("|", "\\|") for x in row]
         lines.append("| " + " | ".join(vals) + " |\n")
-    content = (
-        "# Daily Recommendations\n\n"
-        "字段说明(中文): 运行时间 | 交易日 | 股票代码 | 股票名称 | 筛选模式 | 总分 | 收盘价 | 止损价 | 止盈价 | 建议持股天数\n"
-        "Field Mapping(English): run_time | trade_date | symbol | name | threshold_mode | score_total | close | stop_loss_price | take_profit_price | suggested_holding_days\n\n"
-        + header
-        + sep
-        + "".join(lines)
-    )
-    out_path.write_text(content, encoding="utf-8")
-    return out_path
+    return "# Daily Recommendations\n\n" + _FIELD_NOTES + header + sep + "".join(lines)
 
 
-def append_recommendation_txt(rec: RecommendationResult, path: str) -> Path:
-    out_path = Path(path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    csv_path = out_path.with_suffix(".csv")
-    if csv_path.exists():
-        try:
-            df = pd.read_csv(csv_path, dtype=str)
-        except Exception:
-            df = pd.DataFrame([_build_row(rec)])
-    else:
-        df = pd.DataFrame([_build_row(rec)])
-
-    cols = [
-        "run_time",
-        "trade_date",
-        "symbol",
-        "name",
-        "threshold_mode",
-        "score_total",
-        "close",
-        "stop_loss_price",
-        "take_profit_price",
-        "suggested_holding_days",
-    ]
-    header_labels_cn = {
-        "run_time": "运行时间",
-        "trade_date": "交易日",
-        "symbol": "代码",
-        "name": "名称",
-        "threshold_mode": "模式",
-        "score_total": "总分",
-        "close": "收盘价",
-        "stop_loss_price": "止损价",
-        "take_profit_price": "止盈价",
-        "suggested_holding_days": "建议持股天数",
-    }
-    for c in cols:
-        if c not in df.columns:
-            df[c] = ""
-    df = df[cols].fillna("")
-    if "symbol" in df.columns:
-        df["symbol"] = df["symbol"].map(lambda x: str(x).split(".")[0].zfill(6))
-
-    widths = {c: _display_width(header_labels_cn[c]) for c in cols}
-    for _, r in df.iterrows():
-        for c in cols:
-            widths[c] = max(widths[c], _display_width(str(r[c])))
+def _render_txt(df: pd.DataFrame) -> str:
+    df = _report_frame(df)
+    cols = _REPORT_COLS
+    cells = [[str(x) for x in row] for row in df.to_numpy(dtype=object)]
+    widths = {c: _display_width(_HEADER_LABELS_CN[c]) for c in cols}
+    for i, c in enumerate(cols):
+        widths[c] = max([widths[c], *(_display_width(row[i]) for row in cells)])
 
     def fmt_row(values: list[str]) -> str:
         out = []
@@ -173,21 +169,44 @@ def append_recommendation_txt(rec: RecommendationResult, path: str) -> Path:
             out.append(v + (" " * max(pad, 0)))
         return " | ".join(out)
 
-    header = fmt_row([header_labels_cn[c] for c in cols])
+    header = fmt_row([_HEADER_LABELS_CN[c] for c in cols])
     sep = "-+-".join("-" * widths[c] for c in cols)
-    rows = [fmt_row([str(r[c]) for c in cols]) for _, r in df.iterrows()]
-    content = (
-        "Daily Recommendations\n"
-        "字段说明(中文): 运行时间 | 交易日 | 股票代码 | 股票名称 | 筛选模式 | 总分 | 收盘价 | 止损价 | 止盈价 | 建议持股天数\n"
-        "Field Mapping(English): run_time | trade_date | symbol | name | threshold_mode | score_total | close | stop_loss_price | take_profit_price | suggested_holding_days\n\n"
-        + header
-        + "\n"
-        + sep
-        + "\n"
-        + "\n".join(rows)
-        + "\n"
-    )
-    out_path.write_text(content, encoding="utf-8")
+    rows = [fmt_row(row) for row in cells]
+    return "Daily Recommendations\n" + _FIELD_NOTES + header + "\n" + sep + "\n" + "\n".join(rows) + "\n"
+
+
+def write_reports(
+    rec: RecommendationResult, csv_path: str, md_path: str, txt_path: str, run_time: str | None = None
+) -> tuple[Path, Path, Path]:
+    # Appends rec to the CSV and renders the Markdown/text views from that same history frame.
+    # Pass run_time to stamp several picks from one run identically; defaults to now.
+    out_csv, out_md, out_txt = Path(csv_path), Path(md_path), Path(txt_path)
+    df = _append_history(rec, out_csv, run_time)
+    if df is None:
+        df = _history_for(rec, out_csv)
+    for out_path, content in ((out_md, _render_md(df)), (out_txt, _render_txt(df))):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(content, encoding="utf-8")
+    return out_csv, out_md, out_txt
+
+
+def append_recommendation_csv(rec: RecommendationResult, path: str) -> Path:
+    out_path = Path(path)
+    _append_history(rec, out_path)
+    return out_path
+
+
+def append_recommendation_md(rec: RecommendationResult, path: str) -> Path:
+    out_path = Path(path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(_render_md(_history_for(rec, out_path.with_suffix(".csv"))), encoding="utf-8")
+    return out_path
+
+
+def append_recommendation_txt(rec: RecommendationResult, path: str) -> Path:
+    out_path = Path(path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(_render_txt(_history_for(rec, out_path.with_suffix(".csv"))), encoding="utf-8")
     return out_path
 
 
@@ -207,7 +226,11 @@ def resolve_recommendation_output_log_path(signal_date: date, path_template: str
     return Path(resolved_path)
 
 
+@lru_cache(maxsize=4096)
 def _display_width(s: str) -> int:
+    # Cells repeat heavily across rows (dates, modes, names), and each one is measured twice per render.
+    if s.isascii():
+        return len(s)
     w = 0
     for ch in s:
         w += 2 if unicodedata.east_asian_width(ch) in {"W", "F"} else 1
@@ -1,20 +1,20 @@
 from __future__ import annotations
 
-import numpy as np
-import pandas as pd
+from math import isnan
+from typing import Mapping
 
 from app.strategy.regime_risk import MarketState
 
 
-def suggest_holding_days(latest: pd.Series, market_state: MarketState) -> int:
+def suggest_holding_days(latest: Mapping[str, float], market_state: MarketState) -> int:
     mom20 = float(latest.get("mom20", 0.0))
     vol20 = float(latest.get("vol20_std", 0.05))
     rsi14 = float(latest.get("rsi14", 50.0))
-    if np.isnan(mom20):
+    if isnan(mom20):
         mom20 = 0.0
-    if np.isnan(vol20):
+    if isnan(vol20):
         vol20 = 0.05
-    if np.isnan(rsi14):
+    if isnan(rsi14):
         rsi14 = 50.0
 
     # Base holding days by trend strength and volatility.
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from math import isnan
+from typing import Mapping, Sequence
 
 import numpy as np
 import pandas as pd
@@ -15,20 +17,31 @@ class MarketState:
     mom20: float
 
 
-def detect_market_state(index_closes: dict, signal_date, cfg: dict) -> MarketState:
+def index_close_arrays(index_closes: Mapping) -> tuple[np.ndarray, np.ndarray]:
+    # {date: close} -> (ascending datetime64[D] dates, float64 closes) for detect_market_state.
+    dates = np.fromiter(index_closes.keys(), dtype="datetime64[D]", count=len(index_closes))
+    closes = np.fromiter(index_closes.values(), dtype=np.float64, count=len(index_closes))
+    order = np.argsort(dates, kind="stable")
+    return dates[order], closes[order]
+
+
+def detect_market_state(
+    index_closes: Mapping | tuple[np.ndarray, np.ndarray], signal_date, cfg: dict
+) -> MarketState:
     mcfg = cfg.get("market_filter", {})
     lookback = int(mcfg.get("lookback_days", 120))
-    items = [(d, c) for d, c in index_closes.items() if d <= signal_date]
-    items.sort(key=lambda x: x[0])
-    if not items:
-        return MarketState(label="unknown", close=0.0, ma20=0.0, ma60=0.0, mom20=0.0)
-    series = pd.Series([float(c) for _, c in items][-lookback:])
-    if series.empty:
+    if isinstance(index_closes, tuple):
+        dates, closes = index_closes
+    else:
+        dates, closes = index_close_arrays(index_closes)
+    end = int(np.searchsorted(dates, np.datetime64(signal_date, "D"), side="right"))
+    arr = closes[max(0, end - lookback) : end]
+    if not arr.size:
         return MarketState(label="unknown", close=0.0, ma20=0.0, ma60=0.0, mom20=0.0)
-    close = float(series.iloc[-1])
-    ma20 = float(series.rolling(20).mean().iloc[-1]) if len(series) >= 20 else close
-    ma60 = float(series.rolling(60).mean().iloc[-1]) if len(series) >= 60 else ma20
-    mom20 = float(series.iloc[-1] / series.iloc[-21] - 1.0) if len(series) >= 21 else 0.0
+    close = float(arr[-1])
+    ma20 = float(arr[-20:].mean()) if arr.size >= 20 else close
+    ma60 = float(arr[-60:].mean()) if arr.size >= 60 else ma20
+    mom20 = float(arr[-1] / arr[-21] - 1.0) if arr.size >= 21 else 0.0
     if close > ma20 > ma60 and mom20 > 0:
         label = "bull"
     elif close < ma20 and mom20 < 0:
@@ -38,7 +51,7 @@ def detect_market_state(index_closes: dict, signal_date, cfg: dict) -> MarketSta
     return MarketState(label=label, close=close, ma20=ma20, ma60=ma60, mom20=mom20)
 
 
-def passes_risk_filter(latest: pd.Series, market: MarketState, mode: str, cfg: dict) -> bool:
+def passes_risk_filter(latest: Mapping[str, float], market: MarketState, mode: str, cfg: dict) -> bool:
     rcfg = cfg.get("risk_filter", {})
     if not bool(rcfg.get("enabled", True)):
         return True
@@ -57,7 +70,7 @@ def passes_risk_filter(latest: pd.Series, market: MarketState, mode: str, cfg: d
     mom20 = _to_float(latest.get("mom20", np.nan), np.nan)
     turnover = _to_float(latest.get("turnover_rate", 0.0), 0.0)
 
-    if np.isnan(close) or np.isnan(rsi14) or np.isnan(vol20_std) or np.isnan(vol_ratio) or np.isnan(mom20):
+    if isnan(close) or isnan(rsi14) or isnan(vol20_std) or isnan(vol_ratio) or isnan(mom20):
         return False
     if close < float(rcfg.get("min_price", 2.0)):
         return False
@@ -82,6 +95,73 @@ def passes_risk_filter(latest: pd.Series, market: MarketState, mode: str, cfg: d
     return True
 
 
+def _float_column(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), default)
+    return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+_RISK_FIELDS = ("close", "rsi14", "vol20_std", "vol_ratio_5_20", "mom20")
+
+
+def _risk_bounds(rcfg: dict) -> tuple[np.ndarray, np.ndarray]:
+    # Inclusive (lower, upper) bounds for _RISK_FIELDS, in the same order.
+    lo = np.array(
+        [float(rcfg.get("min_price", 2.0)), -np.inf, -np.inf, float(rcfg.get("min_vol_ratio_5_20", 0.6)), -np.inf]
+    )
+    hi = np.array(
+        [
+            float(rcfg.get("max_price", 200.0)),
+            float(rcfg.get("rsi_upper", 85.0)),
+            float(rcfg.get("max_vol20_std", 0.07)),
+            np.inf,
+            np.inf,
+        ]
+    )
+    return lo, hi
+
+
+def _turnover_values(df: pd.DataFrame, latest_rows: Sequence[Mapping] | None) -> np.ndarray:
+    # passes_risk_filter's rule: a missing or None turnover counts as 0.0, a NaN one stays NaN.
+    if latest_rows is not None:
+        values = (row.get("turnover_rate", 0.0) for row in latest_rows)
+    elif "turnover_rate" in df.columns:
+        values = iter(df["turnover_rate"].tolist())
+    else:
+        return np.zeros(len(df))
+    return np.fromiter((_to_float(v, 0.0) for v in values), dtype=np.float64, count=len(df))
+
+
+def passes_risk_filter_batch(
+    df: pd.DataFrame, market: MarketState, mode: str, cfg: dict, latest_rows: Sequence[Mapping] | None = None
+) -> np.ndarray:
+    # Row-for-row passes_risk_filter over a frame of latest rows. latest_rows, when given, are the dicts df was
+    # built from: building the frame turns a None turnover into NaN once another row has a value.
+    rcfg = cfg.get("risk_filter", {})
+    if not bool(rcfg.get("enabled", True)) or mode == "force":
+        return np.ones(len(df), dtype=bool)
+    market_cfg = cfg.get("market_filter", {})
+    if bool(market_cfg.get("enabled", True)) and market.label == "bear" and bool(market_cfg.get("block_on_bear", True)):
+        return np.zeros(len(df), dtype=bool)
+
+    # All five checked fields side by side, compared against packed lower/upper bounds in one pass.
+    vals = np.column_stack([_float_column(df, name, np.nan) for name in _RISK_FIELDS])
+    lo, hi = _risk_bounds(rcfg)
+    mask = ~(np.isnan(vals).any(axis=1) | ((vals < lo) | (vals > hi)).any(axis=1))
+    vol20_std = vals[:, 2]
+    mom20 = vals[:, 4]
+    if bool(rcfg.get("require_turnover_data", False)):
+        turnover = _turnover_values(df, latest_rows)
+        mask &= ~(turnover <= float(rcfg.get("min_turnover_rate", 0.0)))
+
+    weak_cfg = rcfg.get("weak_market", {})
+    if market.label in {"bear", "neutral"} and bool(weak_cfg.get("enabled", True)):
+        mask &= ~(vol20_std > float(weak_cfg.get("max_vol20_std", 0.05)))
+        if bool(weak_cfg.get("require_mom20_positive", False)):
+            mask &= ~(mom20 <= 0)
+    return mask
+
+
 def _to_float(v, default: float) -> float:
     try:
         if v is None:
@@ -26,6 +26,9 @@ def compute_stop_take_prices(close: float, atr14: float, cfg: dict) -> tuple[flo
 
 
 def _round_price(v: float, tick: float) -> float:
+    if tick == 0.01:
+        # The configured default: multiply by the exact inverse instead of dividing.
+        return math.floor(v * 100.0 + 1e-9) * tick
     if tick <= 0:
         return float(v)
     return math.floor(v / tick + 1e-9) * tick
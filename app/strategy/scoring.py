@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from math import isnan
+from typing import Mapping
 
 import numpy as np
 import pandas as pd
@@ -14,23 +16,52 @@ class ThresholdRule:
     min_mom20: float
 
 
+@dataclass(frozen=True)
+class ScoreWeights:
+    trend: float = 0.35
+    momentum: float = 0.35
+    stability: float = 0.15
+    volume: float = 0.15
+
+    @classmethod
+    def from_cfg(cls, cfg: dict) -> ScoreWeights:
+        # Parsed once per Recommender; negative weights count as zero.
+        w = cfg.get("strategy", {}).get("weights", {})
+        return cls(
+            trend=max(float(w.get("trend", 0.35)), 0.0),
+            momentum=max(float(w.get("momentum", 0.35)), 0.0),
+            stability=max(float(w.get("stability", 0.15)), 0.0),
+            volume=max(float(w.get("volume", 0.15)), 0.0),
+        )
+
+
+def _score_weights(cfg: dict | ScoreWeights) -> ScoreWeights:
+    return cfg if isinstance(cfg, ScoreWeights) else ScoreWeights.from_cfg(cfg)
+
+
+_RULES = {
+    "normal": ThresholdRule(min_rsi=35, max_rsi=75, require_ma_alignment=True, min_mom20=0.0),
+    "relaxed": ThresholdRule(min_rsi=30, max_rsi=80, require_ma_alignment=False, min_mom20=-0.01),
+    "force": ThresholdRule(min_rsi=0, max_rsi=100, require_ma_alignment=False, min_mom20=-1.0),
+}
+
+
 def threshold_from_mode(mode: str) -> ThresholdRule:
-    if mode == "normal":
-        return ThresholdRule(min_rsi=35, max_rsi=75, require_ma_alignment=True, min_mom20=0.0)
-    if mode == "relaxed":
-        return ThresholdRule(min_rsi=30, max_rsi=80, require_ma_alignment=False, min_mom20=-0.01)
-    if mode == "force":
-        return ThresholdRule(min_rsi=0, max_rsi=100, require_ma_alignment=False, min_mom20=-1.0)
-    raise ValueError(f"Unsupported mode: {mode}")
+    try:
+        return _RULES[mode]
+    except KeyError:
+        raise ValueError(f"Unsupported mode: {mode}") from None
 
 
-def passes_threshold(latest: pd.Series, mode: str) -> bool:
+def passes_threshold(latest: Mapping[str, float], mode: str) -> bool:
     rule = threshold_from_mode(mode)
-    if np.isnan(latest["ma20"]) or np.isnan(latest["ma60"]):
+    ma20 = latest["ma20"]
+    ma60 = latest["ma60"]
+    if isnan(ma20) or isnan(ma60):
         return False
-    if latest["close"] <= latest["ma20"]:
+    if latest["close"] <= ma20:
         return False
-    if rule.require_ma_alignment and latest["ma20"] <= latest["ma60"]:
+    if rule.require_ma_alignment and ma20 <= ma60:
         return False
     if latest["mom20"] <= rule.min_mom20:
         return False
@@ -39,40 +70,53 @@ def passes_threshold(latest: pd.Series, mode: str) -> bool:
     return True
 
 
+def passes_threshold_batch(df: pd.DataFrame, mode: str) -> np.ndarray:
+    # Row-for-row passes_threshold over a frame of latest rows; comparisons are negated so NaN behaves the same.
+    rule = threshold_from_mode(mode)
+    close = df["close"].to_numpy(dtype=np.float64)
+    ma20 = df["ma20"].to_numpy(dtype=np.float64)
+    ma60 = df["ma60"].to_numpy(dtype=np.float64)
+    mom20 = df["mom20"].to_numpy(dtype=np.float64)
+    rsi14 = df["rsi14"].to_numpy(dtype=np.float64)
+    mask = ~(np.isnan(ma20) | np.isnan(ma60)) & ~(close <= ma20) & ~(mom20 <= rule.min_mom20)
+    if rule.require_ma_alignment:
+        mask &= ~(ma20 <= ma60)
+    return mask & (rule.min_rsi <= rsi14) & (rsi14 <= rule.max_rsi)
+
+
 def _clip01(v: float, lo: float, hi: float) -> float:
     if hi <= lo:
         return 0.0
-    return float(np.clip((v - lo) / (hi - lo), 0.0, 1.0))
-
-
-def compute_score(latest: pd.Series, cfg: dict) -> tuple[float, dict[str, float]]:
-    strategy = cfg.get("strategy", {})
-    w = strategy.get("weights", {"trend": 0.35, "momentum": 0.35, "stability": 0.15, "volume": 0.15})
-    close = float(latest.get("close", 0.0))
-    ma20 = float(latest.get("ma20", close))
-    ma60 = float(latest.get("ma60", ma20))
-    mom5 = float(latest.get("mom5", 0.0))
-    mom20 = float(latest.get("mom20", 0.0))
-    vol20_std = float(latest.get("vol20_std", 0.03))
-    ma20_slope5 = float(latest.get("ma20_slope5", 0.0))
-    vol_ratio_5_20 = float(latest.get("vol_ratio_5_20", 1.0))
-    volume_zscore20 = float(latest.get("volume_zscore20", 0.0))
-
-    if np.isnan(ma20):
+    return min(max((v - lo) / (hi - lo), 0.0), 1.0)
+
+
+def _score_components(
+    close: float,
+    ma20: float,
+    ma60: float,
+    mom5: float,
+    mom20: float,
+    vol20_std: float,
+    ma20_slope5: float,
+    vol_ratio_5_20: float,
+    volume_zscore20: float,
+) -> tuple[float, float, float, float]:
+    # Pure float arithmetic: scalar np.clip/np.isnan cost far more per call than min/max/math.isnan.
+    if isnan(ma20):
         ma20 = close
-    if np.isnan(ma60):
+    if isnan(ma60):
         ma60 = ma20
-    if np.isnan(mom5):
+    if isnan(mom5):
         mom5 = 0.0
-    if np.isnan(mom20):
+    if isnan(mom20):
         mom20 = 0.0
-    if np.isnan(vol20_std):
+    if isnan(vol20_std):
         vol20_std = 0.03
-    if np.isnan(ma20_slope5):
+    if isnan(ma20_slope5):
         ma20_slope5 = 0.0
-    if np.isnan(vol_ratio_5_20):
+    if isnan(vol_ratio_5_20):
         vol_ratio_5_20 = 1.0
-    if np.isnan(volume_zscore20):
+    if isnan(volume_zscore20):
         volume_zscore20 = 0.0
 
     trend = (
@@ -83,6 +127,23 @@ def compute_score(latest: pd.Series, cfg: dict) -> tuple[float, dict[str, float]
     momentum = (_clip01(mom5, -0.08, 0.12) * 0.5 + _clip01(mom20, -0.15, 0.25) * 0.5) * 100
     stability = (1.0 - _clip01(vol20_std, 0.01, 0.08)) * 100
     volume = (_clip01(vol_ratio_5_20, 0.8, 2.0) * 0.6 + _clip01(volume_zscore20, -0.5, 2.5) * 0.4) * 100
+    return trend, momentum, stability, volume
+
+
+def compute_score(latest: Mapping[str, float], cfg: dict | ScoreWeights) -> tuple[float, dict[str, float]]:
+    close = float(latest.get("close", 0.0))
+    ma20 = float(latest.get("ma20", close))
+    trend, momentum, stability, volume = _score_components(
+        close,
+        ma20,
+        float(latest.get("ma60", ma20)),
+        float(latest.get("mom5", 0.0)),
+        float(latest.get("mom20", 0.0)),
+        float(latest.get("vol20_std", 0.03)),
+        float(latest.get("ma20_slope5", 0.0)),
+        float(latest.get("vol_ratio_5_20", 1.0)),
+        float(latest.get("volume_zscore20", 0.0)),
+    )
 
     score_breakdown = {
         "trend": trend,
@@ -90,23 +151,58 @@ def compute_score(latest: pd.Series, cfg: dict) -> tuple[float, dict[str, float]
         "stability": stability,
         "volume": volume,
     }
-    weights = {
-        "trend": float(w.get("trend", 0.35)),
-        "momentum": float(w.get("momentum", 0.35)),
-        "stability": float(w.get("stability", 0.15)),
-        "volume": float(w.get("volume", 0.15)),
-    }
-    weight_sum = sum(max(v, 0.0) for v in weights.values()) or 1.0
-    total = (
-        trend * max(weights["trend"], 0.0)
-        + momentum * max(weights["momentum"], 0.0)
-        + stability * max(weights["stability"], 0.0)
-        + volume * max(weights["volume"], 0.0)
+    return float(_weighted_total(score_breakdown, _score_weights(cfg))), score_breakdown
+
+
+def _weighted_total(components: dict, weights: ScoreWeights):
+    # Works on floats and on per-candidate arrays alike.
+    weight_sum = weights.trend + weights.momentum + weights.stability + weights.volume or 1.0
+    return (
+        components["trend"] * weights.trend
+        + components["momentum"] * weights.momentum
+        + components["stability"] * weights.stability
+        + components["volume"] * weights.volume
     ) / weight_sum
-    return float(total), score_breakdown
 
 
-def build_reason(latest: pd.Series, score_breakdown: dict[str, float], mode: str) -> list[str]:
+def _column(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), default)
+    values = df[name].to_numpy(dtype=np.float64)
+    return np.where(np.isnan(values), default, values)
+
+
+def _clip01_array(v: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    return np.clip((v - lo) / (hi - lo), 0.0, 1.0)
+
+
+def compute_score_batch(df: pd.DataFrame, cfg: dict | ScoreWeights) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    # One latest indicator row per candidate; same defaults and formulas as compute_score, row for row.
+    close = _column(df, "close", 0.0)
+    ma20 = _column(df, "ma20", np.nan)
+    ma20 = np.where(np.isnan(ma20), close, ma20)
+    ma60 = _column(df, "ma60", np.nan)
+    ma60 = np.where(np.isnan(ma60), ma20, ma60)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trend = (
+            _clip01_array(close / ma20 - 1.0, -0.03, 0.08) * 0.4
+            + _clip01_array(ma20 / ma60 - 1.0, -0.03, 0.08) * 0.4
+            + _clip01_array(_column(df, "ma20_slope5", 0.0), -0.02, 0.04) * 0.2
+        ) * 100
+    momentum = (
+        _clip01_array(_column(df, "mom5", 0.0), -0.08, 0.12) * 0.5
+        + _clip01_array(_column(df, "mom20", 0.0), -0.15, 0.25) * 0.5
+    ) * 100
+    stability = (1.0 - _clip01_array(_column(df, "vol20_std", 0.03), 0.01, 0.08)) * 100
+    volume = (
+        _clip01_array(_column(df, "vol_ratio_5_20", 1.0), 0.8, 2.0) * 0.6
+        + _clip01_array(_column(df, "volume_zscore20", 0.0), -0.5, 2.5) * 0.4
+    ) * 100
+    components = {"trend": trend, "momentum": momentum, "stability": stability, "volume": volume}
+    return _weighted_total(components, _score_weights(cfg)), components
+
+
+def build_reason(latest: Mapping[str, float], score_breakdown: dict[str, float], mode: str) -> list[str]:
     reasons = [
         f"趋势分 {score_breakdown['trend']:.1f}，收盘价高于MA20且中期均线结构较稳。",
         f"动量分 {score_breakdown['momentum']:.1f}，5日/20日动量维持正向。",
@@ -5,24 +5,28 @@ from datetime import date
 from app.models import StockInfo
 
 
-def _excluded_board(symbol: str, exclude_star: bool, exclude_bj: bool, exclude_gem: bool) -> bool:
-    if exclude_star and symbol.startswith(("688", "689")):
-        return True
-    if bool(exclude_gem) and symbol.startswith("300"):
-        return True
+def _excluded_prefixes(exclude_star: bool, exclude_bj: bool, exclude_gem: bool) -> tuple[frozenset[str], frozenset[str]]:
+    # (3-char prefixes, 1-char prefixes) of the boards to drop.
+    prefixes3: set[str] = set()
+    prefixes1: set[str] = set()
+    if exclude_star:
+        prefixes3.update(("688", "689"))
+    if exclude_gem:
+        prefixes3.add("300")
     # Beijing exchange / related prefixes may appear as 4*/8*/9* (including 92*).
-    if exclude_bj and symbol.startswith(("4", "8", "9")):
-        return True
-    return False
+    if exclude_bj:
+        prefixes1.update(("4", "8", "9"))
+    return frozenset(prefixes3), frozenset(prefixes1)
 
 
 def filter_universe(stocks: list[StockInfo], cfg: dict, as_of_date: date) -> list[StockInfo]:
-    _ = as_of_date
     filt = cfg.get("filters", {})
-    exclude_star = bool(filt.get("exclude_star_board", True))
-    exclude_bj = bool(filt.get("exclude_bj_board", True))
-    exclude_gem = bool(filt.get("exclude_gem_board", True))
     exclude_st = bool(filt.get("exclude_st", True))
+    prefixes3, prefixes1 = _excluded_prefixes(
+        bool(filt.get("exclude_star_board", True)),
+        bool(filt.get("exclude_bj_board", True)),
+        bool(filt.get("exclude_gem_board", True)),
+    )
 
     out: list[StockInfo] = []
     for s in stocks:
@@ -30,7 +34,8 @@ def filter_universe(stocks: list[StockInfo], cfg: dict, as_of_date: date) -> lis
             continue
         if s.is_paused:
             continue
-        if _excluded_board(s.symbol, exclude_star, exclude_bj, exclude_gem):
+        symbol = s.symbol
+        if symbol[:3] in prefixes3 or symbol[:1] in prefixes1:
             continue
         out.append(s)
 
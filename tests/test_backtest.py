@@ -7,27 +7,39 @@ from app.backtest.runner import BacktestRunner
 from app.engine.recommender import Recommender
 from tests.test_recommender import FakeDataSource
 
+REQUIRED_SUMMARY_KEYS = frozenset(
+    {
+        "total_trades",
+        "win_rate_gross_1d",
+        "win_rate_gross_3d",
+        "win_rate_net_1d",
+        "win_rate_net_3d",
+        "avg_return_1d_net",
+        "avg_return_3d_net",
+        "attempted_days",
+        "skipped_days",
+        "error_counts",
+        "threshold_mode_counts",
+    }
+)
+
 
 class TestBacktest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One read-only data source for every backtest here, so each symbol's bars are built once.
+        cls.ds = FakeDataSource()
+
     def test_backtest_summary(self):
         cfg = {
             "universe": {"limit": 100},
             "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
             "strategy": {"weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
         }
-        runner = BacktestRunner(Recommender(FakeDataSource(), cfg))
+        runner = BacktestRunner(Recommender(self.ds, cfg))
         summary = runner.run(date(2025, 1, 10), date(2025, 3, 10))
-        self.assertIn("total_trades", summary)
-        self.assertIn("win_rate_gross_1d", summary)
-        self.assertIn("win_rate_gross_3d", summary)
-        self.assertIn("win_rate_net_1d", summary)
-        self.assertIn("win_rate_net_3d", summary)
-        self.assertIn("avg_return_1d_net", summary)
-        self.assertIn("avg_return_3d_net", summary)
-        self.assertIn("attempted_days", summary)
-        self.assertIn("skipped_days", summary)
-        self.assertIn("error_counts", summary)
-        self.assertIn("threshold_mode_counts", summary)
+        missing = REQUIRED_SUMMARY_KEYS - summary.keys()
+        self.assertFalse(missing, f"missing summary keys: {sorted(missing)}")
         self.assertGreaterEqual(summary["total_trades"], 1)
 
     def test_backtest_uses_multi_pick_portfolio(self):
@@ -36,7 +48,7 @@ class TestBacktest(TestCase):
             "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
             "strategy": {"pick_count": 2, "weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
         }
-        runner = BacktestRunner(Recommender(FakeDataSource(), cfg))
+        runner = BacktestRunner(Recommender(self.ds, cfg))
         summary = runner.run(date(2025, 1, 10), date(2025, 3, 10))
         self.assertGreaterEqual(summary["total_trades"], 1)
         self.assertTrue(any("+" in row["symbol"] for row in summary["records"]))
@@ -47,7 +59,32 @@ class TestBacktest(TestCase):
             "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
             "strategy": {"pick_count": 1, "weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
         }
-        runner = BacktestRunner(Recommender(FakeDataSource(), cfg))
+        runner = BacktestRunner(Recommender(self.ds, cfg))
         summary = runner.run(date(2025, 1, 10), date(2025, 3, 10), count=2)
         self.assertGreaterEqual(summary["total_trades"], 1)
         self.assertTrue(any("+" in row["symbol"] for row in summary["records"]))
+
+    def test_backtest_parallel_workers_match_serial(self):
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"pick_count": 2, "weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+        }
+        serial = BacktestRunner(Recommender(self.ds, cfg)).run(date(2025, 1, 10), date(2025, 3, 10))
+        parallel_cfg = {**cfg, "backtest": {"parallel_workers": 2}}
+        parallel = BacktestRunner(Recommender(self.ds, parallel_cfg)).run(date(2025, 1, 10), date(2025, 3, 10))
+        self.assertEqual(serial["records"], parallel["records"])
+        self.assertEqual(serial["error_counts"], parallel["error_counts"])
+
+    def test_backtest_feature_cache_matches_per_day_scan(self):
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"pick_count": 2, "weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+        }
+        uncached_cfg = {**cfg, "backtest": {"cache_features": False}}
+        uncached = BacktestRunner(Recommender(self.ds, uncached_cfg)).run(date(2025, 1, 10), date(2025, 3, 10))
+        recommender = Recommender(self.ds, cfg)
+        cached = BacktestRunner(recommender).run(date(2025, 1, 10), date(2025, 3, 10))
+        self.assertEqual(uncached["records"], cached["records"])
+        self.assertIsNone(recommender._feature_window)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from datetime import date
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -8,6 +9,7 @@ from unittest import TestCase
 import pandas as pd
 
 from app.data_source.akshare_client import AkshareDataSource
+from app.features.indicators import bars_to_df
 from app.models import DailyBar
 
 
@@ -19,6 +21,9 @@ class TestCacheDeterminism(TestCase):
         ds.bars_cache_dir = ds.cache_dir / "bars"
         ds.meta_cache_dir = ds.cache_dir / "meta"
         ds.index_cache_dir = ds.cache_dir / "index"
+        ds._trade_dates_cache = None
+        ds._bars_mem_cache = {}
+        ds._bars_mem_cache_lock = threading.Lock()
         ds.bars_cache_dir.mkdir(parents=True, exist_ok=True)
         ds.meta_cache_dir.mkdir(parents=True, exist_ok=True)
         ds.index_cache_dir.mkdir(parents=True, exist_ok=True)
@@ -70,3 +75,67 @@ class TestCacheDeterminism(TestCase):
             self.assertAlmostEqual(float(old_row["close"]), 10.1, places=8)
             self.assertEqual(len(out[out["trade_date"] == "2026-03-03"]), 1)
             self.assertEqual(len(out[out["trade_date"] == "2026-03-04"]), 1)
+
+    def test_get_trade_dates_slices_cached_calendar(self):
+        with TemporaryDirectory() as tmp:
+            ds = self._build_ds(tmp)
+            pd.DataFrame({"trade_date": ["2026-03-04", "2026-03-02", "2026-03-03", "2026-03-05"]}).to_csv(
+                ds.meta_cache_dir / "trade_calendar.csv", index=False
+            )
+            self.assertEqual(
+                ds.get_trade_dates(date(2026, 3, 3), date(2026, 3, 4)),
+                [date(2026, 3, 3), date(2026, 3, 4)],
+            )
+            self.assertEqual(ds.get_trade_dates(date(2026, 3, 6), date(2026, 3, 9)), [])
+            self.assertEqual(len(ds.get_trade_dates(date(2026, 3, 1), date(2026, 3, 31))), 4)
+
+    def test_get_daily_bars_reuses_parsed_cache_until_saved(self):
+        with TemporaryDirectory() as tmp:
+            ds = self._build_ds(tmp)
+            symbol = "000001"
+            bar = DailyBar(
+                trade_date=date(2026, 3, 3),
+                open=10.0,
+                high=10.2,
+                low=9.9,
+                close=10.1,
+                volume=1000.0,
+                turnover_rate=0.3,
+            )
+            ds._merge_save_bars_cache(symbol, [bar])
+            self.assertEqual(ds._get_bars_from_cache(symbol, date(2026, 3, 3), date(2026, 3, 3)), [bar])
+
+            ds._bars_cache_path(symbol).unlink()
+            self.assertEqual(ds._get_bars_from_cache(symbol, date(2026, 3, 3), date(2026, 3, 3)), [bar])
+
+            ds._merge_save_bars_cache(symbol, [])
+            self.assertNotIn(symbol, ds._bars_mem_cache)
+
+    def test_get_bars_df_matches_cached_daily_bars(self):
+        with TemporaryDirectory() as tmp:
+            ds = self._build_ds(tmp)
+            symbol = "000001"
+            bars = [
+                DailyBar(date(2026, 3, 2), 10.0, 10.2, 9.9, 10.1, 1000.0, 0.3),
+                DailyBar(date(2026, 3, 3), 10.1, 10.4, 10.0, 10.3, 1200.0, None),
+                DailyBar(date(2026, 3, 4), 10.3, 10.5, 10.1, 10.2, 900.0, 0.4),
+            ]
+            ds._merge_save_bars_cache(symbol, bars)
+            start, end = date(2026, 3, 3), date(2026, 3, 4)
+            expected = bars_to_df(ds.get_daily_bars(symbol, start, end))
+            pd.testing.assert_frame_equal(ds.get_bars_df(symbol, start, end), expected)
+
+    def test_incremental_fill_keeps_cached_boundary_row(self):
+        with TemporaryDirectory() as tmp:
+            ds = self._build_ds(tmp)
+            symbol = "000001"
+            cached = DailyBar(date(2026, 3, 3), 10.0, 10.2, 9.9, 10.1, 1000.0, 0.3)
+            ds._merge_save_bars_cache(symbol, [cached])
+            # The right-side refetch starts at the cached max date, so 03-03 comes back with new values.
+            refetched = [
+                DailyBar(date(2026, 3, 3), 11.0, 11.2, 10.8, 11.1, 2000.0, 0.4),
+                DailyBar(date(2026, 3, 4), 12.0, 12.2, 11.8, 12.1, 3000.0, 0.5),
+            ]
+            ds._fetch_remote_bars = lambda *_: refetched
+            bars = ds.get_daily_bars(symbol, date(2026, 3, 3), date(2026, 3, 4))
+            self.assertEqual(bars, [cached, refetched[1]])
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from app.config import load_config
+
+
+class TestConfig(TestCase):
+    def test_load_config_reparses_after_file_change(self) -> None:
+        with TemporaryDirectory() as td:
+            path = Path(td) / "cfg.yaml"
+            path.write_text("strategy:\n  top_n: 3\n", encoding="utf-8")
+            first = load_config(path)
+            self.assertEqual(first["strategy"]["top_n"], 3)
+
+            first["strategy"]["top_n"] = 99
+            self.assertEqual(load_config(path)["strategy"]["top_n"], 3)
+
+            path.write_text("strategy:\n  top_n: 5\n", encoding="utf-8")
+            st = path.stat()
+            os.utime(path, (st.st_atime, st.st_mtime + 10))
+            self.assertEqual(load_config(path)["strategy"]["top_n"], 5)
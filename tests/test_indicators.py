@@ -3,28 +3,28 @@ from __future__ import annotations
 from datetime import date, timedelta
 from unittest import TestCase
 
-from app.features.indicators import add_indicators, bars_to_df
+import numpy as np
+
+from app.features.indicators import INDICATOR_WARMUP_BARS, _rolling_mean, _rolling_std, add_indicators, bars_to_df
 from app.models import DailyBar
 
 
 class TestIndicators(TestCase):
     def test_add_indicators_has_expected_columns(self):
-        bars = []
         start = date(2025, 1, 1)
-        px = 10.0
-        for i in range(80):
-            px *= 1.002
-            bars.append(
-                DailyBar(
-                    trade_date=start + timedelta(days=i),
-                    open=px * 0.99,
-                    high=px * 1.01,
-                    low=px * 0.98,
-                    close=px,
-                    volume=1_000_000,
-                    turnover_rate=1.5,
-                )
+        prices = 10.0 * np.power(1.002, np.arange(1, 81))
+        bars = [
+            DailyBar(
+                trade_date=start + timedelta(days=i),
+                open=px * 0.99,
+                high=px * 1.01,
+                low=px * 0.98,
+                close=px,
+                volume=1_000_000,
+                turnover_rate=1.5,
             )
+            for i, px in enumerate(prices.tolist())
+        ]
         df = add_indicators(bars_to_df(bars))
         self.assertIn("ma20", df.columns)
         self.assertIn("ma60", df.columns)
@@ -33,3 +33,33 @@ class TestIndicators(TestCase):
         self.assertIn("rsi14", df.columns)
         self.assertIn("vol20_std", df.columns)
 
+    def test_rolling_helpers_match_direct_window_reductions(self):
+        rng = np.random.default_rng(7)
+        values = rng.normal(1_000_000.0, 200_000.0, 90)
+        values[10] = np.nan
+        values[40:70] = values[40]
+        for window in (5, 20, 60, 120):
+            expected_mean = np.full(values.shape[0], np.nan)
+            expected_std = np.full(values.shape[0], np.nan)
+            if values.shape[0] >= window:
+                windows = np.lib.stride_tricks.sliding_window_view(values, window)
+                expected_mean[window - 1 :] = windows.mean(axis=1)
+                expected_std[window - 1 :] = windows.std(axis=1, ddof=1)
+            np.testing.assert_allclose(_rolling_mean(values, window), expected_mean, rtol=1e-10)
+            np.testing.assert_allclose(_rolling_std(values, window), expected_std, rtol=1e-8, atol=1e-6)
+        # Flat windows come out exact: the mean is the value itself and the std is 0.
+        self.assertEqual(_rolling_mean(values, 20)[69], values[40])
+        self.assertEqual(_rolling_std(values, 20)[69], 0.0)
+
+    def test_warmup_bars_match_where_latest_row_turns_valid(self):
+        rng = np.random.default_rng(3)
+        start = date(2025, 1, 1)
+        prices = 10.0 * np.cumprod(1.0 + rng.normal(0.0, 0.02, 70))
+        bars = [
+            DailyBar(start + timedelta(days=i), px * 0.99, px * 1.01, px * 0.98, px, 1_000_000 + 1000 * i, 1.5)
+            for i, px in enumerate(prices.tolist())
+        ]
+        for n in range(1, len(bars) + 1):
+            latest = add_indicators(bars_to_df(bars[:n])).iloc[-1]
+            for name, need in INDICATOR_WARMUP_BARS.items():
+                self.assertEqual(bool(np.isnan(latest[name])), n < need, (name, n))
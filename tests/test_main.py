@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from unittest import TestCase, mock, skipIf
+
+import numpy as np
+
+from app import main
+
+
+class TestJsonOutput(TestCase):
+    def _summary(self) -> dict:
+        return {
+            "start": date(2025, 3, 3),
+            "days": np.int64(12),
+            "win_rate_1d": 0.5833333333333334,
+            "avg_net_return_5d": float("nan"),
+            "max_drawdown": np.float64(-0.0421),
+            "mode_counts": {"normal": 9, "force": 3},
+            "records": [{"trade_date": date(2025, 3, 3), "symbol": "000001", "名称": "平安银行", "ret_1d": np.nan}],
+        }
+
+    def test_fallback_writes_null_for_nan(self):
+        with mock.patch.object(main, "orjson", None):
+            text = main._dumps(self._summary())
+        parsed = json.loads(text)
+        self.assertIsNone(parsed["avg_net_return_5d"])
+        self.assertIsNone(parsed["records"][0]["ret_1d"])
+        self.assertEqual(parsed["start"], "2025-03-03")
+        self.assertIn("平安银行", text)
+
+    @skipIf(main.orjson is None, "orjson not installed")
+    def test_fallback_matches_orjson_for_a_typical_summary(self):
+        # Only for values like these: the two still differ on exponent spelling (1e-7 vs 1e-07)
+        # and orjson rejects integers beyond 64 bits.
+        fast = main._dumps(self._summary())
+        with mock.patch.object(main, "orjson", None):
+            fallback = main._dumps(self._summary())
+        self.assertEqual(fast, fallback)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import threading
+from unittest import TestCase
+
+import requests
+
+from app.network import get_thread_session, route_requests_through_shared_session, unroute_requests
+
+
+class TestNetwork(TestCase):
+    def test_each_thread_gets_its_own_session(self):
+        main = get_thread_session()
+        self.assertIs(get_thread_session(), main)
+        other: list[requests.Session] = []
+        worker = threading.Thread(target=lambda: other.append(get_thread_session()))
+        worker.start()
+        worker.join()
+        self.assertIsNot(other[0], main)
+
+    def test_unroute_restores_module_level_requests(self):
+        original = requests.api.request
+        route_requests_through_shared_session()
+        try:
+            self.assertIsNot(requests.api.request, original)
+        finally:
+            unroute_requests()
+        self.assertIs(requests.api.request, original)
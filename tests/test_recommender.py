@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import math
+import threading
 from datetime import date, timedelta
 from unittest import TestCase
 
+import numpy as np
+import pandas as pd
+
 from app.engine.recommender import Recommender
+from app.features.indicators import bars_to_df
 from app.models import DailyBar, StockInfo
 
 
 class FakeDataSource:
     def __init__(self):
         self.trade_dates = [date(2025, 1, 1) + timedelta(days=i) for i in range(100)]
+        self._dates_np = np.array(self.trade_dates, dtype="datetime64[D]")
+        self._bars: dict[str, list[DailyBar]] = {}
+        self._frames: dict[str, pd.DataFrame] = {}
+        self._index_closes = list(range(1000, 1000 + len(self.trade_dates)))
         self.stocks = [
             StockInfo(symbol="000001", name="Alpha"),
             StockInfo(symbol="000002", name="Beta"),
@@ -18,17 +28,56 @@ class FakeDataSource:
     def get_stock_list(self):
         return self.stocks
 
+    def _date_bounds(self, start_date, end_date):
+        lo = np.searchsorted(self._dates_np, np.datetime64(start_date, "D"))
+        hi = np.searchsorted(self._dates_np, np.datetime64(end_date, "D"), side="right")
+        return lo, hi
+
+    def _dates_between(self, start_date, end_date):
+        lo, hi = self._date_bounds(start_date, end_date)
+        return self.trade_dates[lo:hi]
+
     def get_trade_dates(self, start_date, end_date):
-        return [d for d in self.trade_dates if start_date <= d <= end_date]
+        return self._dates_between(start_date, end_date)
 
     def get_daily_bars(self, symbol, start_date, end_date):
-        dates = [d for d in self.trade_dates if start_date <= d <= end_date]
-        bars = []
+        lo, hi = self._date_bounds(start_date, end_date)
+        return self._symbol_bars(symbol)[lo:hi]
+
+    def get_bars_df(self, symbol, start_date, end_date):
+        lo, hi = self._date_bounds(start_date, end_date)
+        return self._symbol_frame(symbol).iloc[lo:hi].reset_index(drop=True)
+
+    def _symbol_closes(self, symbol):
         px = 10.0 if symbol == "000001" else 8.0
         drift = 1.004 if symbol == "000001" else 1.001
-        for i, d in enumerate(dates):
-            p = px * (drift**i)
-            bars.append(
+        return px * np.power(drift, np.arange(len(self.trade_dates)))
+
+    def _symbol_frame(self, symbol):
+        # The same bars as _symbol_bars, built column-wise without DailyBar objects.
+        frame = self._frames.get(symbol)
+        if frame is None:
+            closes = self._symbol_closes(symbol)
+            n = len(closes)
+            frame = self._frames[symbol] = pd.DataFrame(
+                {
+                    "trade_date": self.trade_dates,
+                    "open": closes * 0.99,
+                    "high": closes * 1.01,
+                    "low": closes * 0.98,
+                    "close": closes,
+                    "volume": np.full(n, 1_000_000.0),
+                    "turnover_rate": [2.0] * n,
+                }
+            )
+        return frame
+
+    def _symbol_bars(self, symbol):
+        # Built once per symbol over all trade dates; each request slices the same list.
+        bars = self._bars.get(symbol)
+        if bars is None:
+            closes = self._symbol_closes(symbol)
+            bars = self._bars[symbol] = [
                 DailyBar(
                     trade_date=d,
                     open=p * 0.99,
@@ -38,25 +87,47 @@ class FakeDataSource:
                     volume=1_000_000,
                     turnover_rate=2.0,
                 )
-            )
+                for d, p in zip(self.trade_dates, closes.tolist())
+            ]
         return bars
 
     def get_index_closes(self, symbol, start_date, end_date):
-        dates = [d for d in self.trade_dates if start_date <= d <= end_date]
-        return {d: 1000 + i for i, d in enumerate(dates)}
+        lo, hi = self._date_bounds(start_date, end_date)
+        return dict(zip(self.trade_dates[lo:hi], self._index_closes[lo:hi]))
 
 
 class FakeStaleIndexDataSource(FakeDataSource):
     def get_index_closes(self, symbol, start_date, end_date):
-        stale_end = end_date - timedelta(days=1)
-        dates = [d for d in self.trade_dates if start_date <= d <= stale_end]
-        return {d: 1000 + i for i, d in enumerate(dates)}
+        return super().get_index_closes(symbol, start_date, end_date - timedelta(days=1))
 
 
 class FakeStaleStockDataSource(FakeDataSource):
     def get_daily_bars(self, symbol, start_date, end_date):
         return super().get_daily_bars(symbol, start_date, end_date - timedelta(days=1))
 
+    def get_bars_df(self, symbol, start_date, end_date):
+        return super().get_bars_df(symbol, start_date, end_date - timedelta(days=1))
+
+
+class FakeBarsOnlyDataSource(FakeDataSource):
+    # No frame API: the recommender falls back to get_daily_bars.
+    get_bars_df = None
+
+
+class FakeSuspendedDataSource(FakeDataSource):
+    # 400 calendar days; both symbols are suspended for days 120-299.
+    def __init__(self):
+        super().__init__()
+        self.trade_dates = [date(2024, 1, 1) + timedelta(days=i) for i in range(400)]
+        self._dates_np = np.array(self.trade_dates, dtype="datetime64[D]")
+        self._index_closes = list(range(1000, 1000 + len(self.trade_dates)))
+
+    def get_bars_df(self, symbol, start_date, end_date):
+        df = super().get_bars_df(symbol, start_date, end_date)
+        dates = df["trade_date"]
+        suspended = (dates >= self.trade_dates[120]) & (dates < self.trade_dates[300])
+        return df[~suspended].reset_index(drop=True)
+
 
 class TestRecommender(TestCase):
     def test_recommend_returns_one_stock(self):
@@ -98,3 +169,152 @@ class TestRecommender(TestCase):
         }
         with self.assertRaisesRegex(RuntimeError, "Stock data stale"):
             Recommender(FakeStaleStockDataSource(), cfg).recommend_many(date(2025, 3, 20))
+
+    def test_stale_stock_abort_shuts_down_fetch_pool(self):
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"fetch_workers": 4, "weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+            "data_freshness": {"enabled": False, "stop_on_stale_stock": True},
+        }
+        before = {t.ident for t in threading.enumerate()}
+        kept = None
+        try:
+            Recommender(FakeStaleStockDataSource(), cfg).recommend_many(date(2025, 3, 20))
+        except RuntimeError as exc:
+            # Held like BacktestRunner.run holds a failed day's error; its traceback references the aborted scan.
+            kept = exc
+        self.assertRegex(str(kept), "Stock data stale")
+        self.assertIsNotNone(kept.__traceback__)
+        self.assertEqual([t for t in threading.enumerate() if t.ident not in before], [])
+
+    def test_fallback_modes_fetch_each_symbol_once(self):
+        class CountingDataSource(FakeDataSource):
+            def __init__(self):
+                super().__init__()
+                self.bar_calls: dict[str, int] = {}
+
+            def get_bars_df(self, symbol, start_date, end_date):
+                self.bar_calls[symbol] = self.bar_calls.get(symbol, 0) + 1
+                return super().get_bars_df(symbol, start_date, end_date)
+
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+            "data_freshness": {"enabled": False},
+        }
+        ds = CountingDataSource()
+        rec = Recommender(ds, cfg)
+        # ~50 bars of history: normal/relaxed lack history and fall through to force.
+        result = rec.recommend_many(date(2025, 2, 20))
+        self.assertEqual(rec.get_last_run_meta()["final_mode"], "force")
+        self.assertEqual(result[0].threshold_mode, "force")
+        self.assertEqual(ds.bar_calls, {"000001": 1, "000002": 1})
+
+    def test_market_state_is_resolved_once_per_signal_date(self):
+        class CountingIndexDataSource(FakeDataSource):
+            def __init__(self):
+                super().__init__()
+                self.index_calls = 0
+
+            def get_index_closes(self, symbol, start_date, end_date):
+                self.index_calls += 1
+                return super().get_index_closes(symbol, start_date, end_date)
+
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+        }
+        ds = CountingIndexDataSource()
+        rec = Recommender(ds, cfg)
+        rec.recommend_many(date(2025, 3, 20))
+        rec.recommend_many(date(2025, 3, 20), count=2)
+        self.assertEqual(ds.index_calls, 1)
+
+    def test_prefiltered_symbols_are_still_scored_in_force_mode(self):
+        class FallingDataSource(FakeDataSource):
+            def get_bars_df(self, symbol, start_date, end_date):
+                # Steadily falling closes: below ma20 with negative mom20, so normal mode rejects them.
+                df = super().get_bars_df(symbol, start_date, end_date)
+                return df.assign(close=100.0 - np.arange(len(df)) * 0.1)
+
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+            "data_freshness": {"enabled": False},
+            "market_filter": {"enabled": False},
+        }
+        rec = Recommender(FallingDataSource(), cfg)
+        signal_date = date(2025, 3, 19)
+        universe = rec.data_source.get_stock_list()
+        scan_cache: dict = {}
+        state, _ = rec._resolve_market_state(signal_date)
+        normal, normal_stats = rec._rank_candidates(universe, signal_date, "normal", state, scan_cache=scan_cache)
+        force, _ = rec._rank_candidates(universe, signal_date, "force", state, scan_cache=scan_cache)
+        self.assertEqual(normal, [])
+        self.assertEqual(normal_stats["prefilter_reject"], 2)
+        self.assertEqual(normal_stats["threshold_reject"], 0)
+        self.assertEqual(sorted(c.symbol for c in force), ["000001", "000002"])
+
+    def test_rank_candidates_limit_keeps_the_best_and_counts_all(self):
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+            "data_freshness": {"enabled": False},
+        }
+        rec = Recommender(FakeDataSource(), cfg)
+        signal_date = date(2025, 3, 19)
+        universe = rec.data_source.get_stock_list()
+        state, _ = rec._resolve_market_state(signal_date)
+        ranked, stats = rec._rank_candidates(universe, signal_date, "force", state)
+        top, top_stats = rec._rank_candidates(universe, signal_date, "force", state, limit=1)
+        self.assertEqual(len(ranked), 2)
+        self.assertGreaterEqual(ranked[0].score_total, ranked[1].score_total)
+        self.assertEqual([(c.symbol, c.score_total) for c in top], [(ranked[0].symbol, ranked[0].score_total)])
+        self.assertEqual(top_stats["scored"], stats["scored"])
+
+    def test_bar_frames_match_daily_bars(self):
+        ds = FakeDataSource()
+        start, end = date(2025, 1, 10), date(2025, 3, 20)
+        for symbol in ("000001", "000002"):
+            expected = bars_to_df(ds.get_daily_bars(symbol, start, end))
+            pd.testing.assert_frame_equal(ds.get_bars_df(symbol, start, end), expected)
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"pick_count": 2, "weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+        }
+        from_frames = Recommender(ds, cfg).recommend_many(end)
+        from_bars = Recommender(FakeBarsOnlyDataSource(), cfg).recommend_many(end)
+        self.assertEqual([(r.symbol, r.score_total) for r in from_frames], [(r.symbol, r.score_total) for r in from_bars])
+
+    def test_feature_cache_keeps_short_history_windows_empty_after_suspension(self):
+        cfg = {
+            "universe": {"limit": 100},
+            "filters": {"exclude_st": True, "exclude_star_board": True, "exclude_bj_board": True},
+            "strategy": {"weights": {"trend": 0.4, "momentum": 0.4, "stability": 0.2}},
+        }
+        ds = FakeSuspendedDataSource()
+        rec = Recommender(ds, cfg)
+        # 41 bars since resuming: enough for force mode, too few for ma60.
+        signal_date = ds.trade_dates[340]
+        per_day = rec._scan_symbol("000001", signal_date, "force")
+        # The window-wide fetch reaches back to the bars before the suspension.
+        rec.set_feature_window((ds.trade_dates[250], ds.trade_dates[-1]))
+        cached = rec._scan_symbol("000001", signal_date, "force")
+        rec.set_feature_window(None)
+        self.assertEqual(cached[:3], per_day[:3])
+        self.assertEqual(per_day[1], 41)
+        self.assertTrue(math.isnan(per_day[4]["ma60"]))
+        self.assertEqual(cached[4].keys(), per_day[4].keys())
+        for name, value in per_day[4].items():
+            if isinstance(value, float) and math.isnan(value):
+                self.assertTrue(math.isnan(cached[4][name]), name)
+            elif isinstance(value, float):
+                self.assertAlmostEqual(cached[4][name], value, delta=1e-9 * max(1.0, abs(value)), msg=name)
+            else:
+                self.assertEqual(cached[4][name], value, name)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from app.strategy.regime_risk import MarketState, passes_risk_filter, passes_risk_filter_batch
+
+
+class TestRegimeRisk(TestCase):
+    def test_passes_risk_filter_batch_matches_scalar_checks(self):
+        base = {
+            "close": 11.0,
+            "rsi14": 60.0,
+            "vol20_std": 0.03,
+            "vol_ratio_5_20": 1.0,
+            "mom20": 0.05,
+            "turnover_rate": 2.0,
+        }
+        rows = [
+            base,
+            {**base, "close": 1.5},
+            {**base, "rsi14": 90.0},
+            {**base, "vol20_std": 0.06},
+            {**base, "vol_ratio_5_20": np.nan},
+            {**base, "mom20": -0.01},
+            {**base, "turnover_rate": None},
+            {**base, "turnover_rate": np.nan},
+            {**base, "turnover_rate": 0.0},
+        ]
+        cfg = {"risk_filter": {"require_turnover_data": True, "weak_market": {"require_mom20_positive": True}}}
+        df = pd.DataFrame.from_records(rows)
+        for label in ("bull", "neutral", "bear"):
+            market = MarketState(label=label, close=1.0, ma20=1.0, ma60=1.0, mom20=0.0)
+            for mode in ("normal", "relaxed", "force"):
+                expected = [passes_risk_filter(row, market, mode, cfg) for row in rows]
+                actual = passes_risk_filter_batch(df, market, mode, cfg, latest_rows=rows)
+                self.assertEqual(actual.tolist(), expected)
+
+    def test_batch_rejects_missing_turnover_when_required(self):
+        row = {"close": 11.0, "rsi14": 60.0, "vol20_std": 0.03, "vol_ratio_5_20": 1.0, "mom20": 0.05, "turnover_rate": None}
+        rows = [row, dict(row)]
+        cfg = {"risk_filter": {"require_turnover_data": True}}
+        market = MarketState(label="bull", close=1.0, ma20=1.0, ma60=1.0, mom20=0.0)
+        # An all-None turnover column stays object/None in the frame, as bars_to_df leaves it.
+        df = pd.DataFrame.from_records(rows)
+        self.assertEqual([passes_risk_filter(row, market, "normal", cfg) for row in rows], [False, False])
+        self.assertEqual(passes_risk_filter_batch(df, market, "normal", cfg).tolist(), [False, False])
@@ -1,11 +1,32 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from unittest import TestCase
+from unittest.mock import patch
 
-from app.reporting import append_recommendation_output_log
+from app.models import RecommendationResult
+from app.reporting import (
+    append_recommendation_csv,
+    append_recommendation_md,
+    append_recommendation_output_log,
+    append_recommendation_txt,
+    write_reports,
+)
+
+
+def _rec(symbol: str) -> RecommendationResult:
+    return RecommendationResult(
+        trade_date=date(2026, 3, 3),
+        symbol=symbol,
+        name="测试",
+        score_total=66.666,
+        score_breakdown={},
+        key_metrics={"close": 10.0, "stop_loss_price": 9.5, "take_profit_price": 11.0, "suggested_holding_days": 3},
+        reason=[],
+        threshold_mode="normal",
+    )
 
 
 class TestReporting(TestCase):
@@ -18,3 +39,45 @@ class TestReporting(TestCase):
             content = Path(saved).read_text(encoding="utf-8")
             self.assertEqual(content, "line-a\nline-b\n")
 
+
+    def test_history_cache_follows_external_csv_edits(self):
+        with TemporaryDirectory() as tmp:
+            csv_path = f"{tmp}/rec.csv"
+            append_recommendation_csv(_rec("000001"), csv_path)
+            append_recommendation_csv(_rec("000002"), csv_path)
+            self.assertEqual(len(Path(csv_path).read_text(encoding="utf-8").splitlines()), 3)
+            # Drop the history outside the app; the next append must not resurrect the cached rows.
+            lines = Path(csv_path).read_text(encoding="utf-8").splitlines()
+            Path(csv_path).write_text(lines[0] + "\n", encoding="utf-8")
+            append_recommendation_csv(_rec("000003"), csv_path)
+            md = append_recommendation_md(_rec("000003"), f"{tmp}/rec.md").read_text(encoding="utf-8")
+            self.assertIn("000003", md)
+            self.assertNotIn("000001", md)
+
+    @patch("app.reporting.datetime")
+    def test_write_reports_matches_separate_writers(self, fake_datetime):
+        fake_datetime.now.return_value = datetime(2026, 3, 3, 15, 0, 0)
+        with TemporaryDirectory() as tmp:
+            for symbol in ("000001", "600000"):
+                append_recommendation_csv(_rec(symbol), f"{tmp}/a.csv")
+                append_recommendation_md(_rec(symbol), f"{tmp}/a.md")
+                append_recommendation_txt(_rec(symbol), f"{tmp}/a.txt")
+                saved = write_reports(_rec(symbol), f"{tmp}/b.csv", f"{tmp}/b.md", f"{tmp}/b.txt")
+            self.assertEqual([p.name for p in saved], ["b.csv", "b.md", "b.txt"])
+            for ext in ("md", "txt"):
+                expected = Path(f"{tmp}/a.{ext}").read_text(encoding="utf-8")
+                self.assertEqual(Path(f"{tmp}/b.{ext}").read_text(encoding="utf-8"), expected)
+
+    def test_csv_append_leaves_existing_lines_untouched(self):
+        with TemporaryDirectory() as tmp:
+            csv_path = Path(f"{tmp}/rec.csv")
+            append_recommendation_csv(_rec("000001"), str(csv_path))
+            header, first = csv_path.read_text(encoding="utf-8").splitlines()
+            # A hand-edited line that a parse/rewrite cycle would normalise.
+            edited = first.replace("测试", '"测试"')
+            csv_path.write_text(f"{header}\n{edited}\n", encoding="utf-8")
+            append_recommendation_csv(_rec("000002"), str(csv_path))
+            lines = csv_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(lines[:2], [header, edited])
+            self.assertEqual(len(lines), 3)
+            self.assertIn("000002", lines[2])
@@ -2,9 +2,16 @@ from __future__ import annotations
 
 from unittest import TestCase
 
+import numpy as np
 import pandas as pd
 
-from app.strategy.scoring import compute_score, passes_threshold
+from app.strategy.scoring import (
+    ScoreWeights,
+    compute_score,
+    compute_score_batch,
+    passes_threshold,
+    passes_threshold_batch,
+)
 
 
 class TestScoring(TestCase):
@@ -41,3 +48,39 @@ class TestScoring(TestCase):
         )
         self.assertFalse(passes_threshold(latest, "normal"))
 
+    def test_compute_score_batch_matches_scalar_scores(self):
+        cfg = {"strategy": {"weights": {"trend": 0.4, "momentum": 0.3, "stability": 0.2, "volume": 0.1}}}
+        rows = [
+            {"close": 11.0, "ma20": 10.0, "ma60": 9.5, "mom5": 0.03, "mom20": 0.05, "vol20_std": 0.02, "ma20_slope5": 0.01},
+            {"close": 9.0, "ma20": np.nan, "ma60": np.nan, "mom5": -0.2, "mom20": np.nan, "vol20_std": 0.2, "ma20_slope5": 0.1},
+            {"close": 20.0, "ma20": 18.0, "ma60": 19.0, "mom5": np.nan, "mom20": 0.3, "vol20_std": np.nan, "ma20_slope5": -0.05},
+        ]
+        totals, components = compute_score_batch(pd.DataFrame.from_records(rows), cfg)
+        for i, row in enumerate(rows):
+            total, breakdown = compute_score(row, cfg)
+            self.assertAlmostEqual(float(totals[i]), total, places=12)
+            for name, value in breakdown.items():
+                self.assertAlmostEqual(float(components[name][i]), value, places=12)
+
+    def test_parsed_weights_score_like_the_config_dict(self):
+        cfg = {"strategy": {"weights": {"trend": 0.5, "momentum": -0.2, "stability": 0.3}}}
+        weights = ScoreWeights.from_cfg(cfg)
+        self.assertEqual(weights, ScoreWeights(trend=0.5, momentum=0.0, stability=0.3, volume=0.15))
+        latest = {"close": 11.0, "ma20": 10.0, "ma60": 9.5, "mom5": 0.03, "mom20": 0.05, "vol20_std": 0.02}
+        self.assertEqual(compute_score(latest, weights), compute_score(latest, cfg))
+
+    def test_passes_threshold_batch_matches_scalar_checks(self):
+        base = {"close": 11.0, "ma20": 10.0, "ma60": 9.5, "mom20": 0.05, "rsi14": 60.0}
+        rows = [
+            base,
+            {**base, "rsi14": 90.0},
+            {**base, "ma60": np.nan},
+            {**base, "ma60": 10.5},
+            {**base, "mom20": -0.005},
+            {**base, "mom20": np.nan},
+            {**base, "close": 9.0},
+        ]
+        df = pd.DataFrame.from_records(rows)
+        for mode in ("normal", "relaxed", "force"):
+            expected = [passes_threshold(row, mode) for row in rows]
+            self.assertEqual(passes_threshold_batch(df, mode).tolist(), expected)